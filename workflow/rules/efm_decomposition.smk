@@ -10,3 +10,29 @@ rule efm_decomp_iLC915:
         "../envs/efm_decomp.yaml"
     script:
         "../scripts/efm_decomp_iLC915.py"
+
+## EFM enumeration with efmtool (java): the EFMs of every model of experiments/efm_enumeration/models in the config
+## are written in chunks to results/EFM_enumeration/{model}/ (see efmAnalysis.enumerate_efms)
+## on demand only (not in rule all, a full enumeration of the genome-scale models does not finish): snakemake --cores 8 --use-conda results/EFM_enumeration/{model}/efm_chunks.json
+rule efm_enumeration:
+    output:
+        'results/EFM_enumeration/{model}/efm_chunks.json',
+    threads: 8
+    log:
+        "results/logs/EFM_enumeration_{model}.log"
+    conda:
+        "../envs/efm_decomp.yaml"
+    script:
+        "../scripts/efm_enumeration.py"
+
+## EFM decomposition of the pFBA flux vectors (growth benchmark datasets) of every model of experiments/flux_decomposition/models
+## in the config, the EFMs are generated with an LP each (see efmAnalysis.decompose_fluxes)
+rule flux_decomposition:
+    output:
+        'results/EFM_flux_decomposition/{model}_decomposition.csv',
+    log:
+        "results/logs/EFM_flux_decomposition_{model}.log"
+    conda:
+        "../envs/fba_results.yaml"
+    script:
+        "../scripts/efm_flux_decomposition.py"
@@ -61,3 +61,56 @@ rule carbon_comparison:
         "../envs/fba_results.yaml"
     script:
         '../scripts/carbon_comparison.py'
+
+## growth and biomass yield on every carbon source: one job per model of experiments/carbon_screen/models in the config
+rule carbon_screen:
+    output:
+        'results/FBA_results/carbon_screen/{model}_carbon_screen.csv',
+    threads: 8
+    log:
+        "results/logs/carbon_screen_{model}.log"
+    conda:
+        "../envs/fba_results.yaml"
+    script:
+        '../scripts/carbon_screen.py'
+
+## benchmark of the growth simulations (stage times, LP iterations and RSS of experiments/growth_benchmark/models in the config)
+## every run is appended to the benchmark history (config: experiments/growth_benchmark/history) and checked for timing regressions
+## on demand only (not in rule all): snakemake --cores 1 --use-conda growth_benchmark
+rule growth_benchmark:
+    output:
+        'results/benchmark/growth_benchmark_report.csv',
+    log:
+        "results/logs/growth_benchmark.log"
+    conda:
+        "../envs/fba_results.yaml"
+    script:
+        '../scripts/growth_benchmark.py'
+
+## auto-tuning of the solver settings (config: solver/tuning): FBA, pFBA and FVA of the growth benchmark models with every installed candidate
+## the fastest stable choice per model is recorded in results/solver_tuning and used for models without override if solver/use_tuned is set
+## on demand only (not in rule all): snakemake --cores 1 --use-conda solver_tuning
+rule solver_tuning:
+    output:
+        config['results']['solver_tuning'],
+        'results/solver/solver_tuning_report.csv',
+    log:
+        "results/logs/solver_tuning.log"
+    conda:
+        "../envs/fba_results.yaml"
+    script:
+        '../scripts/solver_tuning.py'
+
+## single and double gene and reaction deletions (essential genes, synthetic lethal pairs) of every model of experiments/gene_essentiality/models
+## in the config (first condition of the growth benchmark dataset, see geneDeletion.DeletionScreen)
+rule gene_essentiality:
+    output:
+        'results/gene_essentiality/{model}_single_deletions.csv',
+        'results/gene_essentiality/{model}_synthetic_lethal_pairs.csv', # synthetic sick or lethal pairs of the double deletions
+    threads: 8
+    log:
+        "results/logs/gene_essentiality_{model}.log"
+    conda:
+        "../envs/fba_results.yaml"
+    script:
+        '../scripts/gene_essentiality.py'
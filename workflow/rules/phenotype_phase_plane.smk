@@ -0,0 +1,12 @@
+## phenotype phase planes (PhPP): one job per model of experiments/PhPP/models in the config
+## the grid parameters are part of the file name, a changed grid is computed again, an unchanged one is reused
+rule phenotype_phase_plane:
+    output:
+        'results/PhPP/{grid}_{{model}}_growth_rates.npy'.format(grid = registry.phpp_grid_name(config['experiments']['PhPP'])),
+    threads: 8
+    log:
+        "results/logs/PhPP_{model}.log"
+    conda:
+        "../envs/fba_results.yaml"
+    script:
+        "../scripts/phenotype_phase_plane.py"
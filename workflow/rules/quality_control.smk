@@ -32,9 +32,12 @@ rule produce_memote_report:
     # Current thread 0x00000002031322c0 (most recent call first):
     # File "/Users/ampholyt/miniconda3/envs/sn/lib/python3.9/site-packages/swiglpk/swiglpk.py", line 569 in glp_intopt
 
+# validates every model once: writes the error table, the validation reports and the parsed models (model cache)
 rule run_model_validation:
     output:
-        config['results']['model_errors']
+        config['results']['model_errors'],
+        config['results']['model_validation'],
+    threads: 8
     log:
         "results/logs/model_validation.log"
     conda:
@@ -43,6 +46,8 @@ rule run_model_validation:
         "../scripts/run_model_validation.py"
 
 rule generate_model_number_table:
+    input:
+        config['results']['model_validation']
     output:
         config['results']['model_numbers']
     log:
@@ -0,0 +1,39 @@
+# screens every carbon source (carbon containing exchange reaction) of one model described in the config (experiments/carbon_screen/models)
+# imports
+import os
+import sys # append path
+
+sys.path.append('../scripts/')
+import helperFunction as hf
+
+config = hf.load_config()
+
+# values: 
+_verbose = config['general']['verbose']
+_snakemake = config['general']['snakemake']
+_screen = config['experiments']['carbon_screen']
+_model_name = 'ppaiLC915' # key of experiments/carbon_screen/models (snakemake: wildcard model)
+_workers = 8
+if _snakemake:
+    _model_name = snakemake.wildcards.model
+    _workers = snakemake.threads
+
+
+def main():
+    descriptor = _screen['models'][_model_name]
+    print(f'screening the carbon sources of {_model_name} ...')
+    screen = hf.carbon_screen(_model_name, descriptor, carbon_mmol=_screen['carbon_mmol'], default_uptake=_screen['default_uptake'], workers=_workers, mode=_screen['mode'], config=config, verbose=_verbose)
+    print(f'{_model_name} grows on {(screen.growth > 1e-6).sum()} of {len(screen)} carbon sources')
+
+    # store growth and yield of every source
+    outfile = f'../results/FBA_results/carbon_screen/{_model_name}_carbon_screen.csv'
+    if _snakemake:
+        outfile = snakemake.output[0]
+    os.makedirs(os.path.dirname(outfile), exist_ok=True)
+    screen.sort_values('growth', ascending=False).to_csv(outfile, sep=config['seperator'])
+    if _verbose:
+        print(screen.sort_values('growth', ascending=False))
+
+
+if __name__ == '__main__':
+    main()
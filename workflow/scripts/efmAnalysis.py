@@ -0,0 +1,335 @@
+# elementary flux modes: EFM store, overlaps, enumeration (efmtool) and decomposition of flux vectors
+import json # chunk manifest
+import os
+import re # efmtool files
+import tempfile # efmtool working directory
+import time # enumeration time
+
+from helperFunction import cobra, np, pd # imported on first use
+
+# EFM store (EFMs as sparse CSR matrix with the reaction ids as column index)
+class EFMStore:
+    '''Elementary flux modes as sparse CSR matrix (one row per EFM, one column per reaction)
+    @params: data, indices, indptr: CSR arrays, reactions: reaction ids of the columns, names: names of the EFMs'''
+
+    def __init__(self, data, indices, indptr, reactions, names=None):
+        self.data = np.asarray(data, dtype=np.float64)
+        self.indices = np.asarray(indices, dtype=np.int32 if len(reactions) < 2**31 else np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.reactions = np.asarray(reactions, dtype=str)
+        self.names = np.asarray(names if names is not None else [f'EFM {i}' for i in range(1, len(self.indptr))], dtype=str)
+        self._reaction_index = None
+
+    @classmethod
+    def from_dense(cls, efms, reactions, names=None, zero_cutoff=0):
+        '''Returns the store of a dense matrix (EFMs x reactions), fluxes with |flux| <= zero_cutoff are dropped'''
+        efms = np.atleast_2d(np.asarray(efms, dtype=np.float64))
+        rows, columns = np.nonzero(np.abs(efms) > zero_cutoff)
+        indptr = np.zeros(efms.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=efms.shape[0]), out=indptr[1:])
+        return cls(efms[rows, columns], columns, indptr, reactions, names)
+
+    @classmethod
+    def load(cls, path):
+        '''Loads a store saved with save (.npz)'''
+        with np.load(path) as arrays:
+            return cls(arrays['data'], arrays['indices'], arrays['indptr'], arrays['reactions'], arrays['names'])
+
+    def save(self, path):
+        '''Saves the store as compressed .npz file (data, indices, indptr, reactions and names arrays)'''
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez_compressed(tmp_path, data=self.data, indices=self.indices, indptr=self.indptr, reactions=self.reactions, names=self.names)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def shape(self):
+        return (len(self), len(self.reactions))
+
+    def reaction_index(self, rxn_id):
+        '''Returns the column of a reaction id'''
+        if self._reaction_index is None:
+            self._reaction_index = {rxn_id: column for column, rxn_id in enumerate(self.reactions)}
+        return self._reaction_index[rxn_id]
+
+    def row_ids(self):
+        '''Returns the EFM (row) of every nonzero flux'''
+        return np.repeat(np.arange(len(self)), np.diff(self.indptr))
+
+    def active_counts(self):
+        '''Returns the number of active reactions (nonzero fluxes) of every EFM'''
+        return np.diff(self.indptr)
+
+    def active_indices(self, efm):
+        '''Returns the reaction indices (columns) of the active reactions of an EFM (row)'''
+        return self.indices[self.indptr[efm]:self.indptr[efm + 1]]
+
+    def active_reactions(self, efm):
+        '''Returns the reaction ids of the active reactions of an EFM (row)'''
+        return self.reactions[self.active_indices(efm)].tolist()
+
+    def fluxes(self, efm):
+        '''Returns the dense flux vector of an EFM (row)'''
+        vector = np.zeros(len(self.reactions))
+        vector[self.active_indices(efm)] = self.data[self.indptr[efm]:self.indptr[efm + 1]]
+        return vector
+
+    def norms(self):
+        '''Returns the euclidean norm of every EFM'''
+        return np.sqrt(np.bincount(self.row_ids(), weights=np.square(self.data), minlength=len(self)))
+
+    def combine(self, coefs):
+        '''Returns the flux vector of the EFMs weighted with the coefficients (efms.T @ coefs)'''
+        coefs = np.asarray(coefs, dtype=np.float64)
+        return np.bincount(self.indices, weights=self.data * coefs[self.row_ids()], minlength=len(self.reactions))
+
+    def subset(self, efms):
+        '''Returns the store of the given EFMs (rows)'''
+        efms = np.asarray(efms, dtype=np.int64)
+        starts, counts = self.indptr[efms], self.indptr[efms + 1] - self.indptr[efms]
+        indptr = np.zeros(len(efms) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        # positions of the nonzeros of the EFMs in data and indices
+        positions = np.arange(indptr[-1]) + np.repeat(starts - indptr[:-1], counts)
+        return EFMStore(self.data[positions], self.indices[positions], indptr, self.reactions, self.names[efms])
+
+    def support_bits(self, by_reaction=False):
+        '''Returns the active reactions of the EFMs as packed bitmatrix (EFMs x reactions, by_reaction: reactions x EFMs)'''
+        rows, columns = self.row_ids(), self.indices.astype(np.int64)
+        if by_reaction:
+            rows, columns = columns, rows
+        n_rows, n_columns = (len(self.reactions), len(self)) if by_reaction else self.shape
+        return _packed_bits(rows, columns, n_rows, n_columns)
+
+def load_efm_store(path, dense_path=None, reactions=None):
+    '''Loads the EFM store (.npz), which is created from the dense EFM matrix (dense_path, .npy) if it does not exist'''
+    if not os.path.isfile(path):
+        if dense_path is None or reactions is None:
+            raise FileNotFoundError(f'{path} does not exist, a dense EFM matrix and its reaction ids are needed to create the store.')
+        EFMStore.from_dense(np.load(dense_path), reactions).save(path)
+    return EFMStore.load(path)
+
+# EFM overlaps (active reactions of the EFMs as packed bitmatrix, the overlaps are counted with bit operations)
+def _packed_bits(rows, columns, n_rows, n_columns):
+    '''Returns the packed bitmatrix (n_rows x ceil(n_columns / 8) uint8) with the bits (rows, columns) set, every bit only once'''
+    n_bytes = (n_columns + 7) // 8
+    # distinct bits of one byte: their sum is their bitwise or
+    bits = np.bincount(rows * n_bytes + columns // 8, weights=128 >> (columns % 8), minlength=n_rows * n_bytes)
+    return bits.astype(np.uint8).reshape(n_rows, n_bytes)
+
+def efm_overlap_counts(efms, selection=None):
+    '''Returns the number of reactions active in exactly each combination of the selected EFMs (Series for upsetplot.plot)'''
+    if selection is not None:
+        efms = efms.subset(list(selection))
+    # membership pattern of every reaction (one bit per EFM), equal patterns are equal byte strings
+    bits = efms.support_bits(by_reaction=True)
+    patterns, counts = np.unique(bits.view(np.dtype((np.void, bits.shape[1]))).ravel(), return_counts=True)
+    patterns = np.frombuffer(patterns.tobytes(), dtype=np.uint8).reshape(len(counts), bits.shape[1])
+    members = np.unpackbits(patterns, axis=1, count=len(efms)).astype(bool)
+    active = members.any(axis=1)
+    index = pd.MultiIndex.from_arrays(list(members[active].T), names=efms.names.tolist())
+    return pd.Series(counts[active], index=index, name='reactions')
+
+def efm_intersection_sizes(efms, selection=None, block_bytes=2**24):
+    '''Returns the number of reactions active in both EFMs for every pair of the selected EFMs (dataframe EFMs x EFMs)'''
+    if selection is not None:
+        efms = efms.subset(list(selection))
+    bits = efms.support_bits()
+    popcount = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1) # number of set bits of every byte
+    sizes = np.zeros((len(efms), len(efms)), dtype=np.int64)
+    step = max(1, block_bytes // max(1, bits.size))
+    for start in range(0, len(efms), step):
+        sizes[start:start + step] = popcount[bits[start:start + step, None, :] & bits[None, :, :]].sum(axis=2)
+    return pd.DataFrame(sizes, index=efms.names, columns=efms.names)
+
+# EFM enumeration (efmtool, the EFMs are written to disk in chunks of EFM stores)
+def efm_network(model):
+    '''Returns the network of a model for efmtool: stoichiometry, reversibilities, reaction and metabolite ids and column signs'''
+    columns = [i for i, rxn in enumerate(model.reactions) if rxn.bounds != (0, 0)]
+    reactions = [model.reactions[i] for i in columns]
+    signs = np.array([-1.0 if rxn.upper_bound <= 0 else 1.0 for rxn in reactions])
+    stoichiometry = cobra.util.create_stoichiometric_matrix(model, array_type='dense')[:, columns] * signs
+    # metabolites of the remaining reactions
+    rows = np.flatnonzero(np.any(stoichiometry != 0, axis=1))
+    reversibilities = [int(rxn.lower_bound < 0 and rxn.upper_bound > 0) for rxn in reactions]
+    return stoichiometry[rows], reversibilities, [rxn.id for rxn in reactions], [model.metabolites[i].id for i in rows], signs
+
+def _efmtool_parts(work_dir):
+    '''Returns the result files of efmtool (efms_0.mat, efms_1.mat, ...) in the order of their numbers'''
+    parts = [file for file in os.listdir(work_dir) if re.fullmatch(r'efms_\d+\.mat', file)]
+    return [os.path.join(work_dir, file) for file in sorted(parts, key=lambda file: int(file[5:-4]))]
+
+def enumerate_efms(model, outdir, chunk_size=100000, zero_cutoff=1e-10, options=None, jvm_options=None, name='EFM', verbose=False):
+    '''Enumerates the EFMs of a model with efmtool and writes them to outdir in chunks of EFM stores (see iter_efm_chunks)
+    Returns the chunk manifest (outdir/efm_chunks.json)'''
+    import efmtool # efm_decomp environment (needs java)
+    import scipy.io
+    start = time.perf_counter()
+    stoichiometry, reversibilities, reactions, metabolites, signs = efm_network(model)
+    os.makedirs(outdir, exist_ok=True)
+    # remove the chunks of a previous run
+    for file in os.listdir(outdir):
+        if re.fullmatch(r'efms_\d+\.npz', file):
+            os.remove(os.path.join(outdir, file))
+
+    manifest = {'reactions': len(reactions), 'metabolites': len(metabolites), 'flipped': [rxn_id for rxn_id, sign in zip(reactions, signs) if sign < 0],
+                'chunk_size': chunk_size, 'efms': 0, 'chunks': []}
+    # efmtool input files, temporary files and results in a working directory next to the chunks (not in /tmp)
+    with tempfile.TemporaryDirectory(dir=outdir) as work_dir:
+        efmtool_options = dict(efmtool.get_default_options(), **{key: str(value) for key, value in (options or {}).items()})
+        efmtool_options.update(tmpdir=work_dir, stoich='stoich.txt', rev='revs.txt', meta='mnames.txt', reac='rnames.txt')
+        np.savetxt(os.path.join(work_dir, 'stoich.txt'), stoichiometry)
+        with open(os.path.join(work_dir, 'revs.txt'), 'w') as file:
+            file.write(' '.join(str(reversibility) for reversibility in reversibilities))
+        with open(os.path.join(work_dir, 'mnames.txt'), 'w') as file:
+            file.write(' '.join(f'"{met_id}"' for met_id in metabolites))
+        with open(os.path.join(work_dir, 'rnames.txt'), 'w') as file:
+            file.write(' '.join(f'"{rxn_id}"' for rxn_id in reactions))
+        args = [arg for key, value in efmtool_options.items() for arg in (f'-{key}', value)] + ['-out', 'matlab', 'efms.mat']
+        if verbose:
+            print(f'efmtool: {len(metabolites)} metabolites, {len(reactions)} reactions ({sum(reversibilities)} reversible)')
+        efmtool.call_efmtool(args, jvm_options)
+
+        for part_file in _efmtool_parts(work_dir):
+            # reactions x EFMs of this part (loaded as a whole), the EFMs are written chunk by chunk
+            part = scipy.io.loadmat(part_file, verify_compressed_data_integrity=False)['mnet']['efms'][0, 0]
+            if part.shape[0] != len(reactions):
+                raise ValueError(f'{part_file} has {part.shape[0]} reactions, the network has {len(reactions)}.')
+            for first in range(0, part.shape[1], chunk_size):
+                block = part[:, first:first + chunk_size].T * signs
+                n = manifest['efms']
+                chunk = f"efms_{len(manifest['chunks']):05d}.npz"
+                EFMStore.from_dense(block, reactions, [f'{name} {i}' for i in range(n + 1, n + len(block) + 1)], zero_cutoff).save(os.path.join(outdir, chunk))
+                manifest['chunks'].append(chunk)
+                manifest['efms'] += len(block)
+            del part
+            os.remove(part_file)
+            if verbose:
+                print(f"{manifest['efms']} EFMs in {len(manifest['chunks'])} chunks")
+
+    manifest['seconds'] = time.perf_counter() - start
+    tmp_file = os.path.join(outdir, f'efm_chunks.json.{os.getpid()}.tmp')
+    with open(tmp_file, 'w') as file:
+        json.dump(manifest, file, indent=1)
+    os.replace(tmp_file, os.path.join(outdir, 'efm_chunks.json'))
+    return manifest
+
+def iter_efm_chunks(directory):
+    '''Yields the EFM stores of an enumeration (see enumerate_efms) chunk by chunk'''
+    with open(os.path.join(directory, 'efm_chunks.json'), 'r') as file:
+        manifest = json.load(file)
+    for chunk in manifest['chunks']:
+        yield EFMStore.load(os.path.join(directory, chunk))
+
+# EFM decomposition of a flux vector (the EFMs are generated one by one with an LP, no enumeration of all EFMs)
+def _flux_vector(model, fluxes):
+    '''Returns the flux vector of a model (order of model.reactions) from a Series, a one-row flux matrix (see getReactionFluxes) or an array,
+    ValueError if it does not contain the flux of every reaction of the model'''
+    rxn_ids = [rxn.id for rxn in model.reactions]
+    if isinstance(fluxes, pd.DataFrame):
+        if len(fluxes) != 1:
+            raise ValueError(f'Expected a flux matrix with one row, got {len(fluxes)} rows.')
+        fluxes = fluxes.iloc[0]
+    if isinstance(fluxes, pd.Series):
+        missing = [rxn_id for rxn_id in rxn_ids if rxn_id not in fluxes.index]
+        if missing:
+            raise ValueError(f'The fluxes of {len(missing)} reactions of the model are missing (e.g. {", ".join(missing[:5])}).')
+        fluxes = fluxes[~fluxes.index.duplicated()].reindex(rxn_ids)
+    vector = np.asarray(fluxes, dtype=np.float64)
+    if vector.shape != (len(rxn_ids),) or np.isnan(vector).any():
+        raise ValueError(f'Expected {len(rxn_ids)} fluxes (one per reaction of the model) without nan.')
+    return vector
+
+def decompose_fluxes(model, fluxes, zero_cutoff=1e-9, max_imbalance=1e-5, names=None, verbose=False):
+    '''Decomposes a flux vector of all reactions into sign-conform EFMs with one LP per EFM (flux without balanced EFM stays residual)
+    Returns the EFMs (EFMStore) and their coefficients, ValueError if the imbalance of the flux vector exceeds max_imbalance (relative)'''
+    from optlang.symbolics import Zero
+    vector = _flux_vector(model, fluxes)
+    cutoff = zero_cutoff * max(np.abs(vector).max(), 1.0)
+    support = np.flatnonzero(np.abs(vector) > cutoff)
+    signs = np.sign(vector[support])
+    remaining = np.abs(vector[support]) # fluxes in the direction of the flux vector
+
+    # LP: mass balances of the active reactions, fluxes in the direction of the flux vector (x >= 0)
+    interface = model.solver.interface
+    lp = interface.Model()
+    variables = [interface.Variable(f'x_{k}', lb=0) for k in range(len(support))]
+    lp.add(variables)
+    coefficients = {}
+    imbalances = {}
+    for variable, i, sign in zip(variables, support, signs):
+        for metabolite, coefficient in model.reactions[i].metabolites.items():
+            coefficients.setdefault(metabolite.id, {})[variable] = coefficient * sign
+            imbalances[metabolite.id] = imbalances.get(metabolite.id, 0) + coefficient * vector[i]
+    largest_imbalance = max(np.abs(list(imbalances.values())), default=0)
+    if largest_imbalance > max_imbalance * max(np.abs(vector).max(), 1.0):
+        raise ValueError(f'The flux vector is not at steady state (largest imbalance {largest_imbalance:.3g}).')
+    balanced = [met_id for met_id in coefficients if abs(imbalances[met_id]) <= cutoff]
+    tolerance = max(cutoff, largest_imbalance)
+    if verbose and len(balanced) < len(coefficients):
+        print(f'not balanced by the flux vector: {", ".join(met_id for met_id in coefficients if abs(imbalances[met_id]) > cutoff)}')
+    constraints = {met_id: interface.Constraint(Zero, lb=0, ub=0, name=f'mass_balance_{n}') for n, met_id in enumerate(balanced)}
+    # imbalances (only used if no EFM contains the pivot reaction)
+    slacks = [(interface.Variable(f'surplus_{n}', lb=0, ub=0), interface.Variable(f'deficit_{n}', lb=0, ub=0)) for n in range(len(balanced))]
+    lp.add([slack for pair in slacks for slack in pair])
+    lp.add(list(constraints.values()))
+    lp.objective = interface.Objective(Zero, direction='min')
+    lp.update()
+    for (met_id, constraint), (surplus, deficit) in zip(constraints.items(), slacks):
+        constraint.set_linear_coefficients({**coefficients[met_id], surplus: -1, deficit: 1})
+    lp.objective.set_linear_coefficients({slack: 1 / cutoff for pair in slacks for slack in pair})
+
+    rows, columns, data, coefs = [], [], [], []
+    active = remaining > 0
+    while active.any():
+        pivot = np.argmax(remaining)
+        variables[pivot].set_bounds(1, 1)
+        lp.objective.set_linear_coefficients({variable: 1 / remaining[k] if active[k] else 0 for k, variable in enumerate(variables)})
+        status = lp.optimize()
+        if status != 'optimal':
+            for pair in slacks:
+                for slack in pair:
+                    slack.ub = None
+            status = lp.optimize()
+            imbalance = sum(slack.primal for pair in slacks for slack in pair) if status == 'optimal' else 0
+            if imbalance > max_imbalance or imbalance * remaining[pivot] > tolerance:
+                status = 'imbalanced'
+            for pair in slacks:
+                for slack in pair:
+                    slack.ub = 0
+        variables[pivot].set_bounds(0, None)
+        if status != 'optimal':
+            # the remaining flux of the pivot reaction is residual
+            if verbose:
+                print(f'no EFM with {model.reactions[support[pivot]].id} (LP {status}), residual flux {remaining[pivot]:.3g}')
+            remaining[pivot] = 0
+            variables[pivot].ub = 0
+            active[pivot] = False
+            continue
+        primals = lp.primal_values
+        efm = np.array([primals[variable.name] for variable in variables])
+        efm[efm < zero_cutoff] = 0
+        used = np.flatnonzero(efm)
+        # largest coefficient: the reaction with the smallest remaining flux per EFM flux drops out
+        ratios = remaining[used] / efm[used]
+        coef = ratios.min()
+        remaining[used] -= coef * efm[used]
+        remaining[used[np.argmin(ratios)]] = 0
+        remaining[remaining <= cutoff] = 0
+        for k in np.flatnonzero(active & (remaining == 0)):
+            variables[k].ub = 0
+        active = remaining > 0
+        rows.append(len(used))
+        columns.append(support[used])
+        data.append(efm[used] * signs[used])
+        coefs.append(coef)
+    if verbose:
+        print(f'{len(coefs)} EFMs, {len(support)} active reactions')
+
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(rows, out=indptr[1:])
+    efms = EFMStore(np.concatenate(data) if data else [], np.concatenate(columns) if columns else [], indptr, [rxn.id for rxn in model.reactions], names)
+    return efms, np.array(coefs)
@@ -2,49 +2,44 @@
 import cobra
 import numpy as np # load efm data
 import matplotlib.pyplot as plt
-import pandas as pd # upset plot
 import sys # append path
 from upsetplot import plot # upset plot
 import os
 
 sys.path.append('../scripts/')
 import helperFunction as hf
+import efmAnalysis as efa
 # read config (for model path)
 config = hf.load_config()
 
 # read data
-coefs = np.load(config['experiments']['efm_decomposition']['coefs'])
-efms = np.load(config['experiments']['efm_decomposition']['efms'])
-optimal_vector = np.load(config['experiments']['efm_decomposition']['optimal_vector'])
+_efm_config = config['experiments']['efm_decomposition']
+coefs = np.load(_efm_config['coefs'])
+optimal_vector = np.load(_efm_config['optimal_vector'])
+# EFMs as sparse matrix with the reaction ids of iLC915 (created from the dense matrix efms.npy on the first run)
+_reactions = None if os.path.isfile(_efm_config['efm_store']) else [rxn.id for rxn in hf.load_model('ppaiLC915', config).reactions]
+efms = efa.load_efm_store(_efm_config['efm_store'], _efm_config['efms'], _reactions)
 
 # set names of EFMs
-_efm_names = [f'EFM {i}' for i in range(1, len(efms)+1)] 
+_efm_names = efms.names.tolist()
 
 # get number of active reactions in each EFM
-_rxn_number = []
-for efm in efms:
-    _rxn_number.append(len(efm[np.where(efm!=0)])) 
+_rxn_number = efms.active_counts().tolist()
 # [336, 342, 340, 340, 2, 3, 3, 3]
 
 
-if all(np.round(np.dot(efms.T,coefs),6) == np.round(optimal_vector,6)):
+if all(np.round(efms.combine(coefs),6) == np.round(optimal_vector,6)):
     print('Imported decomposition is equal to decomposition')
 
 
-def scaled_efm(efm, coef):
-    '''scale efms and their coefficients to the same range'''
-    efm_scaled = efm/np.linalg.norm(efm)
-    coef_scaled = coef * np.linalg.norm(efm)
-    return efm_scaled, coef_scaled
+def scaled_efm(norm, coef):
+    '''scale coefficients of efms to the same range (coefficient * norm of the efm)'''
+    coef_scaled = coef * norm
+    return coef_scaled
 
 def store_scaled_coefficients(outpath = '../results/EFM_decomposition/scaled_coefs.png'):
     '''store scaled coefficients plot'''
-    scaled_efms = []
-    scaled_coefs = []
-    for i in range(8):
-        efm_scaled, coef_scaled = scaled_efm(efms[i], coefs[i])
-        scaled_efms.append(efm_scaled)
-        scaled_coefs.append(coef_scaled)
+    scaled_coefs = [scaled_efm(norm, coef) for norm, coef in zip(efms.norms()[:8], coefs[:8])]
 
     # plot scaled coefficients as bar plot with x-axis = EFMs annotate values
     plt.xlabel('EFMs')
@@ -98,42 +93,11 @@ def plot_active_reactions(outpath='../results/EFM_decomposition/active_reactions
     # store plot as png
     plt.savefig(outpath, dpi=300)
 
-def get_rxns_from_indices(rxn_ids, indices):
-    '''returns list of reactions with given indices'''
-    rxns = []
-    for i in indices:
-        rxns.append(rxn_ids[i])
-    return rxns
-
-def upset_plot_first_four_efms(iLC915_model, outpath='../results/EFM_decomposition/upset_plot_EFM1-4.png'):
-    '''plot upset plot for first four EFMs'''
-    # combine EFMs and reaction IDs
-
-    # get reaction IDs
-    _rxm_ids = [rxn.id for rxn in iLC915_model.reactions]
-
-    # get active reactions and indices from EFMs
-    _efm_active_rxns = []
-    _efm_active_index = []
-
-    for efm in efms:
-        non_zero_tuple = np.where(efm!=0)
-        active_rxns = get_rxns_from_indices(_rxm_ids, non_zero_tuple[0])
-        _efm_active_index.append(non_zero_tuple[0])
-        _efm_active_rxns.append(active_rxns)
-
-
-    rxn_set_1 = set(_efm_active_rxns[0])
-    rxn_set_2 = set(_efm_active_rxns[1])
-    rxn_set_3 = set(_efm_active_rxns[2])
-    rxn_set_4 = set(_efm_active_rxns[3])
-
-
-    set_names = ['EFM 1', 'EFM 2', 'EFM 3', 'EFM 4']
-    all_elems = rxn_set_1.union(rxn_set_2).union(rxn_set_3).union(rxn_set_4)
-    df = pd.DataFrame([[e in rxn_set_1, e in rxn_set_2, e in rxn_set_3, e in rxn_set_4] for e in all_elems], columns = set_names)
-    df_up = df.groupby(set_names).size()
-    plot(df_up, orientation='horizontal', sort_by='cardinality', show_counts=True)
+def upset_plot_efms(efms, selection=range(4), outpath='../results/EFM_decomposition/upset_plot_EFM1-4.png'):
+    '''plot upset plot for the selected EFMs (default: first four EFMs)'''
+    # number of reactions of every combination of active sets (packed bitmatrix of the EFM store, see efmAnalysis.efm_overlap_counts)
+    overlaps = efa.efm_overlap_counts(efms, selection)
+    plot(overlaps, orientation='horizontal', sort_by='cardinality', show_counts=True)
     # store plot as png
     plt.savefig(outpath, dpi=300, bbox_inches='tight')
 
@@ -155,8 +119,7 @@ def main():
     # active reactions
     plot_active_reactions(outpath_active)
     # upset plot
-    iLC915_model = cobra.io.read_sbml_model(config['models']['ppaiLC915'])
-    upset_plot_first_four_efms(iLC915_model, outpath_upset)
+    upset_plot_efms(efms, range(4), outpath_upset)
     print('EFM decomposition of iLC915 finished.')
 
 
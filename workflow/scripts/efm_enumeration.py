@@ -0,0 +1,38 @@
+# enumerates the EFMs of one model of the EFM decomposition (experiments/efm_enumeration/models) with efmtool,
+# the EFMs are written in chunks of EFM stores (see efmAnalysis.enumerate_efms and iter_efm_chunks)
+# imports
+import os
+import sys # append path
+
+sys.path.append('../scripts/')
+import helperFunction as hf
+import efmAnalysis as efa
+
+config = hf.load_config()
+
+# values:
+_verbose = config['general']['verbose']
+_snakemake = config['general']['snakemake']
+_enumeration = config['experiments']['efm_enumeration']
+_model_name = 'iLC915' # key of experiments/efm_enumeration/models (snakemake: wildcard model)
+_threads = 8
+if _snakemake:
+    _model_name = snakemake.wildcards.model
+    _threads = snakemake.threads
+
+
+def main():
+    model = hf.load_model(os.path.join(config['results']['EFM_model_dir'], _enumeration['models'][_model_name]), config)
+    options = dict({'maxthreads': _threads}, **(_enumeration['options'] or {}))
+
+    outfile = f'../results/EFM_enumeration/{_model_name}/efm_chunks.json'
+    if _snakemake:
+        outfile = snakemake.output[0]
+    print(f'enumerating the EFMs of {_model_name} ...')
+    manifest = efa.enumerate_efms(model, os.path.dirname(outfile), _enumeration['chunk_size'], _enumeration['zero_cutoff'], options,
+                                 _enumeration['jvm_options'], verbose=_verbose)
+    print(f"{_model_name}: {manifest['efms']} EFMs in {len(manifest['chunks'])} chunks ({manifest['seconds']:.0f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# EFM decomposition of the pFBA flux vectors of one model (experiments/flux_decomposition/models) in every condition of its
+# growth benchmark dataset: the EFMs are generated with one LP each (see efmAnalysis.decompose_fluxes), no EFM enumeration
+# imports
+import os
+import sys # append path
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append('../scripts/')
+import helperFunction as hf
+import efmAnalysis as efa
+
+config = hf.load_config()
+
+# values:
+_verbose = config['general']['verbose']
+_snakemake = config['general']['snakemake']
+_decomposition = config['experiments']['flux_decomposition']
+_benchmark = config['experiments']['growth_benchmark'] # model descriptors and datasets
+_model_name = 'ppaiLC915' # one of experiments/flux_decomposition/models (snakemake: wildcard model)
+if _snakemake:
+    _model_name = snakemake.wildcards.model
+
+
+def main():
+    descriptor = _benchmark['models'][_model_name]
+    dataset = _benchmark['datasets'][descriptor['dataset']]
+    model = hf.load_prepared_model(_model_name, descriptor, config)
+    roles = {'growth': descriptor['biomass'], **descriptor['uptakes']}
+
+    outfile = f'../results/EFM_flux_decomposition/{_model_name}_decomposition.csv'
+    if _snakemake:
+        outfile = snakemake.output[0]
+    outdir = os.path.dirname(outfile)
+
+    # pFBA of every condition
+    fluxes = hf.BatchPFBA(model, descriptor['biomass']).solve(hf.dataset_patches(model, descriptor, dataset))
+    table = []
+    for condition, vector in fluxes.iterrows():
+        if vector.isna().any():
+            print(f'{_model_name} condition {condition + 1}: infeasible')
+            continue
+        start = time.perf_counter()
+        efms, coefs = efa.decompose_fluxes(model, vector, _decomposition['zero_cutoff'], verbose=_verbose)
+        seconds = time.perf_counter() - start
+        residual = np.abs(vector.to_numpy() - efms.combine(coefs)).max()
+        print(f'{_model_name} condition {condition + 1}: {len(efms)} EFMs in {seconds:.2f} s (residual {residual:.2g})')
+        efms.save(os.path.join(outdir, f'{_model_name}_condition_{condition + 1}_efms.npz'))
+        # contribution of every EFM to the growth rate and the uptakes
+        for efm, coef in enumerate(coefs):
+            row = {'condition': condition + 1, 'efm': efms.names[efm], 'coefficient': coef, 'active_reactions': efms.active_counts()[efm]}
+            flux_vector = efms.fluxes(efm)
+            row.update({role: coef * flux_vector[efms.reaction_index(rxn_id)] for role, rxn_id in roles.items()})
+            row.update({'residual': residual, 'seconds': seconds})
+            table.append(row)
+
+    table = pd.DataFrame(table)
+    os.makedirs(outdir, exist_ok=True)
+    table.to_csv(outfile, sep=config['seperator'], index=False)
+    if _verbose:
+        print(table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+# gene and reaction deletions: GPR rules of a model (GPR index) and single and double deletion screens solved with the bound patches of helperFunction
+import ast # GPR rules
+import itertools # pairs of the double deletions
+import time # deletion timings
+import weakref # GPR index of every model
+
+from helperFunction import cobra, np, pd, SweepEngine, _sweep_model, solve_patches
+
+# GPR rules (compiled per model to and/or node levels, evaluated with numpy for one or many gene knockout sets at once)
+_gpr_indices = weakref.WeakKeyDictionary() # GPR index of every model (see gpr_index)
+
+class GPRIndex:
+    '''GPR rules of all reactions of a model, evaluated with numpy for one or many gene knockout sets at once'''
+
+    def __init__(self, model):
+        self.genes = [gene.id for gene in model.genes]
+        self.reactions = [rxn.id for rxn in model.reactions]
+        self._gene_index = {gene_id: index for index, gene_id in enumerate(self.genes)}
+        nodes = [] # level, conjunction (and node) and child references of every and/or node
+        references = [] # reference of the rule of every reaction with genes (gene index or -(node + 1))
+        self._ruled = np.array([index for index, rxn in enumerate(model.reactions) if rxn.genes], dtype=np.int64)
+        for index in self._ruled:
+            references.append(self._compile(model.reactions[int(index)].gpr, nodes)[0])
+
+        # positions of the values: genes first, then the nodes sorted by level and operation
+        order = sorted(range(len(nodes)), key=lambda node: (nodes[node][0], not nodes[node][1]))
+        positions = np.empty(len(nodes), dtype=np.int64)
+        positions[order] = np.arange(len(self.genes), len(self.genes) + len(nodes))
+        def position(reference):
+            return reference if reference >= 0 else positions[-reference - 1]
+        self._size = len(self.genes) + len(nodes)
+        self._roots = np.array([position(reference) for reference in references], dtype=np.int64)
+        # groups of nodes with the same level and operation (consecutive positions): children of all nodes and start of every node
+        self._groups = []
+        for (level, conjunction), group in itertools.groupby(order, key=lambda node: nodes[node][:2]):
+            group = list(group)
+            children = [position(child) for node in group for child in nodes[node][2]]
+            offsets = np.cumsum([0] + [len(nodes[node][2]) for node in group[:-1]])
+            self._groups.append((positions[group[0]], positions[group[-1]] + 1, np.array(children, dtype=np.int64), offsets, conjunction))
+
+        # single knockout sets: only the ancestors of the knocked-out genes can become False (children before parents in position order)
+        self._children = [[int(position(child)) for child in children] for _, _, children in (nodes[node] for node in order)]
+        self._conjunctions = [nodes[node][1] for node in order]
+        parents = [[] for _ in range(self._size)]
+        for offset, children in enumerate(self._children):
+            for child in children:
+                parents[child].append(len(self.genes) + offset)
+        self._ancestors = []
+        for gene in range(len(self.genes)):
+            ancestors, stack = set(), list(parents[gene])
+            while stack:
+                node = stack.pop()
+                if node not in ancestors:
+                    ancestors.add(node)
+                    stack.extend(parents[node])
+            self._ancestors.append(ancestors)
+        self._root_reactions = {}
+        for reaction, root in zip(self._ruled, self._roots):
+            self._root_reactions.setdefault(int(root), []).append(int(reaction))
+
+        members = np.zeros((len(self.genes), len(self.reactions)), dtype=bool)
+        for index, rxn in enumerate(model.reactions):
+            members[[self._gene_index[gene.id] for gene in rxn.genes], index] = True
+        self.gene_reactions = np.packbits(members, axis=1)
+
+    def _compile(self, expr, nodes):
+        '''Returns the reference and the level of a GPR rule (ast), the and/or nodes are appended to nodes'''
+        if isinstance(expr, (ast.Expression, ast.Module)): # cobra GPR
+            return self._compile(expr.body, nodes)
+        if isinstance(expr, ast.Name):
+            return self._gene_index[expr.id], 0
+        if isinstance(expr, ast.BoolOp):
+            children = [self._compile(value, nodes) for value in expr.values]
+            level = 1 + max(child_level for _, child_level in children)
+            nodes.append((level, isinstance(expr.op, ast.And), [reference for reference, _ in children]))
+            return -len(nodes), level
+        raise TypeError(f'Unsupported GPR expression: {ast.dump(expr)}')
+
+    def active(self, alive):
+        '''Returns whether the rule of every reaction is True for the alive genes (genes or genes x knockout sets)'''
+        alive = np.asarray(alive, dtype=bool)
+        values = np.empty((self._size,) + alive.shape[1:], dtype=bool)
+        values[:len(self.genes)] = alive
+        for start, stop, children, offsets, conjunction in self._groups:
+            values[start:stop] = (np.logical_and if conjunction else np.logical_or).reduceat(values[children], offsets, axis=0)
+        active = np.ones((len(self.reactions),) + alive.shape[1:], dtype=bool)
+        active[self._ruled] = values[self._roots]
+        return active
+
+    def disabled_matrix(self, gene_sets, batch_size=1024):
+        '''Returns the reactions disabled by every knockout set (list of gene id lists) as bool matrix (sets x reactions)'''
+        gene_sets = list(gene_sets)
+        disabled = np.zeros((len(gene_sets), len(self.reactions)), dtype=bool)
+        for start in range(0, len(gene_sets), batch_size):
+            batch = gene_sets[start:start + batch_size]
+            alive = np.ones((len(self.genes), len(batch)), dtype=bool)
+            for column, genes in enumerate(batch):
+                alive[[self._gene_index[gene_id] for gene_id in genes], column] = False
+            disabled[start:start + len(batch)] = ~self.active(alive).T
+        return disabled
+
+    def disabled(self, genes):
+        '''Returns the indices of the reactions disabled by knocking out the genes (ids), only the ancestor nodes of the genes are evaluated'''
+        false = {self._gene_index[gene_id] for gene_id in genes}
+        for node in sorted(set().union(*(self._ancestors[gene] for gene in false))):
+            children = self._children[node - len(self.genes)]
+            if (any if self._conjunctions[node - len(self.genes)] else all)(child in false for child in children):
+                false.add(node)
+        return np.array(sorted(reaction for node in false for reaction in self._root_reactions.get(node, ())), dtype=np.int64)
+
+    def disabled_reactions(self, genes):
+        '''Returns the ids of the reactions disabled by knocking out the genes (ids)'''
+        return [self.reactions[index] for index in self.disabled(genes)]
+
+def gpr_index(model):
+    '''Returns the GPR index of the model (see GPRIndex), built once per model object'''
+    if model not in _gpr_indices:
+        _gpr_indices[model] = GPRIndex(model)
+    return _gpr_indices[model]
+
+# Gene and reaction deletions (knocked-out reactions as bitsets, an LP only for deletions which knock out flux of a known solution)
+def _bitset(mask):
+    '''Returns the bitset (int, bit i: element i) of a boolean array'''
+    return int.from_bytes(np.packbits(np.asarray(mask, dtype=bool), bitorder='little').tobytes(), 'little')
+
+def _bit_indices(bits):
+    '''Returns the indices of the set bits of a bitset (int)'''
+    if not bits:
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.unpackbits(np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, 'little'), dtype=np.uint8), bitorder='little'))
+
+class DeletionScreen:
+    '''Single and double gene or reaction deletions of one model in one condition, only deletions which knock out flux are solved
+    @params: model_key, prepare, base, config: see solve_patches'''
+
+    def __init__(self, model_key, prepare=None, base=None, objective=None, workers=1, zero_cutoff=1e-8, growth_tolerance=1e-6, chunk_size=16, config=None, verbose=False):
+        self.model_key, self.prepare, self.base, self.config = model_key, prepare, base, config
+        self.workers, self.zero_cutoff, self.growth_tolerance, self.chunk_size, self.verbose = workers, zero_cutoff, growth_tolerance, chunk_size, verbose
+        model = _sweep_model(model_key, prepare, config)
+        if objective is None:
+            objective = next(iter(cobra.util.solver.linear_reaction_coefficients(model))).id
+        self.objective = objective
+        self.reactions = [rxn.id for rxn in model.reactions]
+        self._reaction_bits = {rxn_id: 1 << index for index, rxn_id in enumerate(self.reactions)}
+        self.genes = [gene.id for gene in model.genes]
+        start = time.perf_counter()
+        with model:
+            SweepEngine._apply_patch(model, base or {})
+            model.objective = objective
+            self.blocked = set(cobra.flux_analysis.find_blocked_reactions(model, processes=workers))
+        if verbose:
+            print(f'{len(self.blocked)} of {len(self.reactions)} reactions blocked ({time.perf_counter() - start:.2f} s)')
+        self.gpr = gpr_index(model)
+        self._unblocked = _bitset([rxn_id not in self.blocked for rxn_id in self.reactions])
+        # reactions (not blocked) of every gene and knocked-out reactions of the gene sets (cache)
+        self._gene_reactions = {gene_id: _bitset(np.unpackbits(row, count=len(self.reactions))) & self._unblocked for gene_id, row in zip(self.gpr.genes, self.gpr.gene_reactions)}
+        self._gene_knockouts = {}
+        self._growth = {} # growth of the knocked-out sets (bitsets)
+        self._support = {} # reactions with flux (bitset) in the solution of the knocked-out sets of the reference and the single deletions
+        self.solved = set() # knocked-out sets solved with an LP
+        self._solve([0], support=True)
+        self.reference_growth = self._growth[0]
+
+    def _solve(self, knockouts, support=False):
+        '''Solves the knocked-out sets (bitsets) which are not solved yet, with support the reactions with flux are kept'''
+        knockouts = [knockout for knockout in dict.fromkeys(knockouts) if knockout not in self._growth]
+        if not knockouts:
+            return
+        start = time.perf_counter()
+        patches = [{self.reactions[index]: (0, 0) for index in _bit_indices(knockout)} for knockout in knockouts]
+        growth, fluxes = solve_patches(self.model_key, patches, self.objective, self.reactions if support else (), self.workers, 'fba',
+                                       self.prepare, self.base, self.config, self.chunk_size)
+        for index, knockout in enumerate(knockouts):
+            self._growth[knockout] = growth[index]
+            if support:
+                self._support[knockout] = _bitset(np.abs(fluxes[index]) > self.zero_cutoff)
+        self.solved.update(knockouts)
+        if self.verbose:
+            print(f'{len(knockouts)} deletions solved in {time.perf_counter() - start:.2f} s')
+
+    def _inherited(self, knockout, parents):
+        '''Returns the solved parent whose solution has no flux through the knocked-out reactions (None: solve the set)'''
+        return next((parent for parent in parents if not knockout & self._support[parent]), None)
+
+    def _ids(self, kind, ids):
+        if kind not in ('gene', 'reaction'):
+            raise ValueError(f'Unknown deletion kind {kind}, use gene or reaction')
+        return list(ids) if ids is not None else list(self.genes if kind == 'gene' else self.reactions)
+
+    def _gene_set_knockouts(self, gene_sets, cache=True):
+        '''Returns the bitsets of the reactions knocked out by every gene set'''
+        keys = [frozenset(genes) for genes in gene_sets]
+        missing = list(dict.fromkeys(key for key in keys if key not in self._gene_knockouts))
+        knockouts = {key: _bitset(disabled) & self._unblocked for key, disabled in zip(missing, self.gpr.disabled_matrix(missing))}
+        if cache:
+            self._gene_knockouts.update(knockouts)
+        return [self._gene_knockouts[key] if key in self._gene_knockouts else knockouts[key] for key in keys]
+
+    def _knockout(self, kind, ids):
+        '''Returns the bitset of the reactions knocked out by deleting the genes or reactions (ids)'''
+        if kind == 'gene':
+            return self._gene_set_knockouts([ids])[0]
+        knocked = 0
+        for rxn_id in ids:
+            if rxn_id not in self.blocked:
+                knocked |= self._reaction_bits[rxn_id]
+        return knocked
+
+    def _single_knockouts(self, kind, ids):
+        '''Returns the knocked-out sets of the single deletions, all of them solved or inherited from the reference (with its support)'''
+        knockouts = self._gene_set_knockouts([(item,) for item in ids]) if kind == 'gene' else [self._knockout(kind, (item,)) for item in ids]
+        self._solve([knockout for knockout in knockouts if knockout not in self._growth and self._inherited(knockout, (0,)) is None], support=True)
+        for knockout in knockouts:
+            if knockout not in self._growth:
+                self._growth[knockout], self._support[knockout] = self._growth[0], self._support[0]
+        return knockouts
+
+    def _relative(self, growth):
+        return np.asarray(growth, dtype=float) / self.reference_growth if self.reference_growth > self.growth_tolerance else np.full(len(growth), np.nan)
+
+    def single_deletions(self, kind='gene', ids=None):
+        '''Returns growth, relative_growth, knocked_out and solved of the deletion of every gene or reaction (default: all)'''
+        ids = self._ids(kind, ids)
+        knockouts = self._single_knockouts(kind, ids)
+        growth = [self._growth[knockout] for knockout in knockouts]
+        return pd.DataFrame({'growth': growth, 'relative_growth': self._relative(growth), 'knocked_out': [bin(knockout).count('1') for knockout in knockouts],
+                             'solved': [bool(knockout) and knockout in self.solved for knockout in knockouts]}, index=pd.Index(ids, name=kind))
+
+    def double_deletions(self, kind='gene', ids=None):
+        '''Returns the pairs of genes or reactions (default: all) whose double deletion grows less than both single deletions'''
+        ids = self._ids(kind, ids)
+        singles = self._single_knockouts(kind, ids)
+        # lethal single deletions are lethal in every pair, pairs with a deletion without (possible) knocked-out reactions grow like the other one
+        candidates = [index for index, (item, knockout) in enumerate(zip(ids, singles)) if self._growth[knockout] > self.growth_tolerance
+                      and (knockout or kind == 'gene' and self._gene_reactions[item])]
+        start = time.perf_counter()
+        # only gene pairs with common reactions can knock out more than their single deletions (e.g. isoenzymes)
+        shared = [(ids[a], ids[b]) for a, b in itertools.combinations(candidates, 2) if kind == 'gene' and self._gene_reactions[ids[a]] & self._gene_reactions[ids[b]]]
+        shared = dict(zip(shared, self._gene_set_knockouts(shared, cache=False)))
+        pairs, knockouts = [], []
+        for a, b in itertools.combinations(candidates, 2):
+            knockout = singles[a] | singles[b] | shared.get((ids[a], ids[b]), 0)
+            if self._inherited(knockout, (singles[a], singles[b])) is None:
+                pairs.append((a, b))
+                knockouts.append(knockout)
+        if self.verbose:
+            print(f'{len(candidates) * (len(candidates) - 1) // 2} pairs pruned to {len(knockouts)} deletions ({len(set(knockouts))} knocked-out sets) in {time.perf_counter() - start:.2f} s')
+        self._solve(knockouts)
+
+        rows = []
+        for (a, b), knockout in zip(pairs, knockouts):
+            single_growth = min(self._growth[singles[a]], self._growth[singles[b]])
+            if self._growth[knockout] < single_growth - self.growth_tolerance:
+                rows.append((ids[a], ids[b], self._growth[knockout], single_growth))
+        double = pd.DataFrame(rows, columns=[f'{kind}_1', f'{kind}_2', 'growth', 'single_growth'])
+        double.insert(3, 'relative_growth', self._relative(double.growth))
+        return double
@@ -0,0 +1,66 @@
+# single and double gene and reaction deletions of one model (experiments/gene_essentiality/models) in the first condition of its
+# growth benchmark dataset (e.g. 2.43 mmol/gDW/h glucose for the Yli models): blocked reactions are pruned, every knocked-out reaction set is solved once
+# and only deletions which knock out flux of a known solution are solved (see geneDeletion.DeletionScreen), replaces used_code/geneEssentiality.py
+# imports
+import os
+import sys # append path
+import time
+
+import pandas as pd
+
+sys.path.append('../scripts/')
+import helperFunction as hf
+import geneDeletion as gd
+
+config = hf.load_config()
+
+# values:
+_verbose = config['general']['verbose']
+_snakemake = config['general']['snakemake']
+_essentiality = config['experiments']['gene_essentiality']
+_benchmark = config['experiments']['growth_benchmark'] # model descriptors and datasets
+_model_name = 'yli21' # one of experiments/gene_essentiality/models (snakemake: wildcard model)
+_workers = 8
+if _snakemake:
+    _model_name = snakemake.wildcards.model
+    _workers = snakemake.threads
+
+
+def main():
+    descriptor = _benchmark['models'][_model_name]
+    dataset = _benchmark['datasets'][descriptor['dataset']]
+    model = hf.load_prepared_model(_model_name, descriptor, config)
+    condition = hf.dataset_patches(model, descriptor, dataset)[0]
+
+    start = time.perf_counter()
+    screen = gd.DeletionScreen(_model_name, descriptor, condition, descriptor['biomass'], workers=_workers, zero_cutoff=_essentiality['zero_cutoff'],
+                               growth_tolerance=_essentiality['growth_tolerance'], chunk_size=_essentiality['chunk_size'], config=config, verbose=_verbose)
+    single, double = [], []
+    for kind in _essentiality['single']:
+        deletions = screen.single_deletions(kind)
+        deletions['essential'] = deletions.relative_growth < _essentiality['essential_threshold']
+        print(f"{_model_name}: {deletions.essential.sum()} of {len(deletions)} {kind}s essential ({deletions.solved.sum()} deletions solved)")
+        single.append(deletions.reset_index().rename(columns={kind: 'id'}).assign(type=kind))
+    for kind in _essentiality['double']:
+        deletions = screen.double_deletions(kind)
+        print(f"{_model_name}: {len(deletions)} synthetic sick or lethal {kind} pairs")
+        double.append(deletions.rename(columns={f'{kind}_1': 'id_1', f'{kind}_2': 'id_2'}).assign(type=kind))
+    print(f'{_model_name}: {len(screen.solved)} knocked-out reaction sets solved in {time.perf_counter() - start:.2f} s')
+
+    outfile_single = f'../results/gene_essentiality/{_model_name}_single_deletions.csv'
+    outfile_double = f'../results/gene_essentiality/{_model_name}_synthetic_lethal_pairs.csv' # only the synthetic sick or lethal pairs
+    if _snakemake:
+        outfile_single = snakemake.output[0]
+        outfile_double = snakemake.output[1]
+    os.makedirs(os.path.dirname(outfile_single), exist_ok=True)
+    single = pd.concat(single, ignore_index=True) if single else pd.DataFrame(columns=['id', 'growth', 'relative_growth', 'knocked_out', 'solved', 'essential', 'type'])
+    double = pd.concat(double, ignore_index=True) if double else pd.DataFrame(columns=['id_1', 'id_2', 'growth', 'relative_growth', 'single_growth', 'type'])
+    single.to_csv(outfile_single, sep=config['seperator'], index=False)
+    double.to_csv(outfile_double, sep=config['seperator'], index=False)
+    if _verbose:
+        print(single[single.essential])
+        print(double)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,6 @@
-import cobra
 import sys  
 import os # generate path  
 import pandas as pd
-import yaml
 
 # include helper functions
 sys.path.append('../scripts/')
@@ -11,17 +9,17 @@ import helperFunction as hf
 # get config
 config = hf.load_config()
 
-def create_model_numbers_table(models, outpath, seperator):
-    '''Uses models dictionary to create one dataframe with the model numbers'''
+def create_model_numbers_table(validation, outpath, seperator):
+    '''Uses the validation results of run_model_validation.py to create one dataframe with the model numbers'''
     numberDFs = []
     # iterate all models 
-    for model_name, model_path in models.items():
-        # load and validate model
-        model, report = cobra.io.validate_sbml_model(model_path)
-        # check if model is nontype 
-        if isinstance(model,type(None)):
+    for model_name, result in validation.items():
+        # models which could not be loaded during the validation are skipped
+        if not result['loadable']:
             print(f'{model_name} is NoneType')
             continue
+        # parsed during the validation => loaded from the model cache
+        model = hf.load_model(result['path'], config)
         numberDFs.append(hf.numberDf(model,model_name, config['results']['model_numbers_directory'], seperator, True, False))
 
     # concat all dataframes
@@ -34,8 +32,8 @@ def create_model_numbers_table(models, outpath, seperator):
 if __name__ == '__main__':
     seperator = config['seperator'] # ';' is fine
 
-    ## load models
-    models = hf.get_all_models()
+    ## load validation results (models and reports)
+    validation = hf.load_model_validation(config['results']['model_validation'])
     
     # generate model numbers table
-    modelNumbers = create_model_numbers_table(models, config['results']['model_numbers'], seperator)
\ No newline at end of file
+    modelNumbers = create_model_numbers_table(validation, config['results']['model_numbers'], seperator)
@@ -0,0 +1,63 @@
+# benchmark of the growth simulations of the configured models (experiments/growth_benchmark): time of every stage
+# (load, preparation, pFBA build and solve), LP iterations and RSS to the experimental growth rates
+# every run is appended to the benchmark history (json) and compared with the previous runs (timing regressions)
+# imports
+import datetime
+import os
+import platform
+import sys # append path
+
+import cobra
+import pandas as pd
+
+sys.path.append('../scripts/')
+import helperFunction as hf
+
+config = hf.load_config()
+
+# values:
+_verbose = config['general']['verbose']
+_snakemake = config['general']['snakemake']
+_benchmark = config['experiments']['growth_benchmark']
+
+
+def main():
+    run = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'cobra': cobra.__version__,
+        'solver': cobra.Configuration().solver.__name__,
+        'models': {},
+    }
+    for model_name, descriptor in _benchmark['models'].items():
+        dataset = _benchmark['datasets'][descriptor['dataset']]
+        record = hf.growth_benchmark(model_name, descriptor, dataset, config)
+        run['models'][model_name] = record
+        print(f"{model_name}: load {record['load_s']:.2f} s, prepare {record['prepare_s']:.3f} s, build {record['build_s']:.2f} s, "
+              f"solve {record['solve_s']:.2f} s ({record['lp_solves']} LPs, {record['lp_iterations']} iterations), RSS {record['rss']:.4f}")
+
+    # compare with the previous runs and append the run to the history
+    history = hf.load_benchmark_history(_benchmark['history'])
+    run['regressions'] = hf.benchmark_regressions(history, run, _benchmark['regression_tolerance'], _benchmark['regression_window'], _benchmark['regression_min_seconds'], _benchmark['regression_min_runs'])
+    history.append(run)
+    hf.store_benchmark_history(history, _benchmark['history'])
+    for regression in run['regressions']:
+        print(f"regression: {regression['model']} {regression['stage']} {regression['seconds']:.2f} s (median of previous runs: {regression['baseline']:.2f} s)")
+
+    # report of this run
+    report = pd.DataFrame.from_dict({model_name: {key: value for key, value in record.items() if key != 'growth'} for model_name, record in run['models'].items()}, orient='index')
+    report.index.name = 'model'
+    outfile = '../results/benchmark/growth_benchmark_report.csv'
+    if _snakemake:
+        outfile = snakemake.output[0]
+    os.makedirs(os.path.dirname(outfile), exist_ok=True)
+    report.to_csv(outfile, sep=config['seperator'])
+    if _verbose:
+        print(report)
+
+    if run['regressions'] and _benchmark['fail_on_regression']:
+        sys.exit(f"{len(run['regressions'])} timing regressions, see {_benchmark['history']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,40 @@
 # helper functions:
-import cobra
+# cobra, pandas and numpy are imported on first use (see _lazy_import), matplotlib only by the plot functions and swiglpk only by the GLPK specific functions:
+# the Snakefile and short scripts which only read the config or the model registry do not pay their start-up
+# EFMs: efmAnalysis, gene and reaction deletions: geneDeletion
 from configparser import ConfigParser, ExtendedInterpolation # config file parsing
 import os
-import pandas as pd
-import numpy as np # plot multiple conditions
-import matplotlib.pyplot as plt # plot multiple conditions
-import yaml # config file parsing
+import hashlib # model cache keys
+import importlib.util # lazy imports
+import json # validation results
+import multiprocessing # parallel validation and sweeps
+from multiprocessing import resource_tracker, shared_memory # sweep results
+import pickle # model cache
+import re # metabolite formulas in names
+import sys # lazy imports
+import time # model cache timings
+
+from modelRegistry import ModelDescriptor, get_registry, load_config, get_all_models, get_loadable_models, get_models, get_model_path, get_model_key, phpp_grid_name # config and model registry
+
+
+def _lazy_import(name):
+    '''Returns the module, which is executed on the first attribute access (importlib.util.LazyLoader)'''
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+cobra = _lazy_import('cobra')
+pd = _lazy_import('pandas')
+np = _lazy_import('numpy')
 
 _sep = ';'
+_model_cache_timings = [] # one entry per load_model call (see model_cache_report)
+_solver_tunings = {} # loaded auto-tuning results per file (see solver_settings)
 
 
 # print functions or extensions of implemented features
@@ -128,17 +155,11 @@ def getNames(elementList):
     '''Returns the names of the elemts in the given list (list of genes, reactions or metabolites'''
     return [elem.name for elem in elementList]
 
-# Find all reactions which are associated with a given gene (or list of genes)
+# Find all reactions which are disabled by knocking out a given gene (or list of genes)
 def findReactionsForGenes(model, gene_list, blocked_rxn_list = []):
-    '''Returns a list of reactions which are associated with the given genes and not in blocked_rxn_list'''
-    # find all reactions which are associated with the given genes
-    essential_reactions = set()
-    for gene_id in gene_list:
-        for reaction in model.genes.get_by_id(gene_id).reactions:
-            # check if the reaction is in the blocked reaction list
-            if reaction.id not in blocked_rxn_list: 
-                essential_reactions.add(reaction.id)
-    return list(essential_reactions)
+    '''Returns a list of reactions which are disabled by knocking out the given genes (GPR rules) and not in blocked_rxn_list'''
+    from geneDeletion import gpr_index # imports this module
+    return [rxn_id for rxn_id in gpr_index(model).disabled_reactions(gene_list) if rxn_id not in blocked_rxn_list]
 
 def model_specific_manipulations(model_name, ex_rxn):
     """Takes model name and exchange reaction name and returns the exchange metabolite name."""
@@ -246,10 +267,63 @@ def prepare_iLC915_model(model):
         elif rxn.id in glucose:
             rxn.bounds = (0,glu_uptake)
 
-def getReactionFluxes(model, reactions, biomass_rxn, growth_condition, maintenance_rxn, maintenance, verbose=False):
-    """Computes FBA solution of a given growth condition and returns the fluxes of the reactions of interest"""
-    current_fluxes = {}
+def _closed_reactions(profile):
+    '''Returns the closed reactions of a profile ('closed_reactions': list or {group: list})'''
+    closed = profile.get('closed_reactions', [])
+    return [rxn_id for group in closed.values() for rxn_id in group] if isinstance(closed, dict) else list(closed)
+
+def compile_bounds(*profiles):
+    '''Merges preparation profiles or model descriptors into one bounds update ({reaction id: bounds}, closed reactions and fixed bounds, later entries win)'''
+    bounds = {}
+    for profile in profiles:
+        bounds.update(dict.fromkeys(_closed_reactions(profile), (0, 0)))
+        bounds.update({rxn_id: tuple(rxn_bounds) for rxn_id, rxn_bounds in profile.get('bounds', {}).items()})
+    return bounds
+
+def apply_bounds(model, bounds):
+    '''Sets the bounds of a bounds update (see compile_bounds), every reaction is set once'''
+    for rxn_id, rxn_bounds in bounds.items():
+        model.reactions.get_by_id(rxn_id).bounds = rxn_bounds
+
+def preparation_profile(descriptor, config=None):
+    '''Returns the preparation profile of a model descriptor (config: preparations/<descriptor['preparation']>, {} without)'''
+    preparation = descriptor.get('preparation')
+    if not preparation:
+        return {}
+    config = config if config is not None else load_config()
+    profiles = config.get('preparations', {})
+    if preparation not in profiles:
+        raise KeyError(f'Unknown preparation {preparation}, use one of {list(profiles)}')
+    return profiles[preparation]
+
+def prepare_model(model, descriptor, config=None):
+    '''Applies the preparation of a model descriptor: preparation profile, closed reactions, bounds and objective ('biomass')'''
+    apply_bounds(model, compile_bounds(preparation_profile(descriptor, config), descriptor))
+    if 'biomass' in descriptor:
+        model.objective = descriptor['biomass']
+    return model
+
+def save_flux_matrix(fluxes, outfile):
+    '''Stores a flux matrix (index: conditions, columns: reactions) as .npz or .parquet'''
+    os.makedirs(os.path.dirname(outfile) or '.', exist_ok=True)
+    if outfile.endswith('.parquet'):
+        fluxes = fluxes.astype(np.float64)
+        fluxes.columns = fluxes.columns.astype(str)
+        fluxes.to_parquet(outfile)
+    else:
+        np.savez(outfile, fluxes=fluxes.to_numpy(dtype=np.float64), conditions=fluxes.index.astype(str).to_numpy(dtype=str),
+                 reactions=fluxes.columns.astype(str).to_numpy(dtype=str))
+
+def load_flux_matrix(infile):
+    '''Loads a flux matrix stored with save_flux_matrix (.npz or .parquet)'''
+    if infile.endswith('.parquet'):
+        return pd.read_parquet(infile)
+    with np.load(infile) as data:
+        return pd.DataFrame(data['fluxes'], index=pd.Index(data['conditions'], name='condition'), columns=pd.Index(data['reactions'], name='reaction'))
 
+def getReactionFluxes(model, reactions, biomass_rxn, growth_condition, maintenance_rxn, maintenance, verbose=False, condition='pFBA'):
+    '''Computes the pFBA solution of a growth condition and returns it as flux matrix with one row (condition, see save_flux_matrix)
+    @params: reactions: reaction ids or {key: reaction id, '-' if not mapped} of the columns (None: all reactions, callers reindex)'''
     # compute FBA solution
     # set objective function
     model.objective = biomass_rxn
@@ -262,10 +336,11 @@ def getReactionFluxes(model, reactions, biomass_rxn, growth_condition, maintenan
     pfba_solution = cobra.flux_analysis.pfba(model)
     if verbose:
         print(f'The objective value of the {model} is: {pfba_solution.fluxes[biomass_rxn]}')
-    # collect pathway fluxes
-    for ec_number, rxn_id in reactions.items():
-        current_fluxes[ec_number] = (pfba_solution.fluxes[rxn_id],rxn_id)
-    return current_fluxes
+    fluxes = pfba_solution.fluxes.astype(np.float64).to_frame(condition).T
+    if reactions is not None:
+        rxn_ids = reactions.values() if isinstance(reactions, dict) else reactions
+        fluxes = fluxes.reindex(columns=list(dict.fromkeys(rxn_id for rxn_id in rxn_ids if rxn_id != '-')))
+    return fluxes
 
 def plot_multiple_conditions(value_dict, conditions, title, y_label, outpath, min_value = 0, max_value = 0.3, show_plot=True):
     '''Plot the for each condition of multiple models the given values (in a dict of value lists) + list of conditions
@@ -276,6 +351,8 @@ def plot_multiple_conditions(value_dict, conditions, title, y_label, outpath, mi
     # min_value = max(0, min([sublist[-1] for sublist in list(value_dict.values())]))
     # max_value = max([sublist[-1] for sublist in list(value_dict.values())])
 
+    import matplotlib.pyplot as plt # plotting dependency, only loaded by the plot functions
+
     x = np.arange(len(conditions))  # the label locations
     width = 0.1  # the width of the bars
     multiplier = 0
@@ -316,71 +393,1138 @@ def numberDf(model, modelPrefix, outputDir, sep, createOutput, verbose):
         modelNumbers.to_csv(outputDir + modelPrefix + '_modelNumbers.csv', index=False, sep=sep)
     return modelNumbers
 
-def load_config(config_name='model_config'):
-    config_path = f'../config/{config_name}.yaml'
+# Solver settings (config: solver, defaults, per-model overrides and auto-tuned choices)
+_default_solver_settings = {'interface': 'glpk', 'presolve': 'auto', 'lp_method': 'auto', 'timeout': None}
+_solver_aliases = {'highs': ('hybrid',), 'osqp': ('osqp', 'hybrid')} # optlang >= 1.6: HiGHS (LPs) and OSQP (QPs) in the hybrid interface
+_glpk_lp_methods = {'primal': 'GLP_PRIMAL', 'dual': 'GLP_DUAL', 'dualp': 'GLP_DUALP'} # swiglpk constants
 
-    # load config
-    with open(config_path, 'r') as file:
-        config = yaml.safe_load(file)
-    return config
+def solver_interface(name):
+    '''Returns the optlang interface of a solver name (e.g. glpk, scipy, osqp or highs), ValueError if it is not installed'''
+    solvers = cobra.util.solver.solvers
+    for interface in _solver_aliases.get(name.lower(), (name.lower(),)):
+        if interface in solvers:
+            return solvers[interface]
+    raise ValueError(f'The solver {name} is not installed, installed solvers: {", ".join(solvers)}')
+
+def solver_available(name):
+    '''Returns True if the solver is installed (see solver_interface)'''
+    try:
+        solver_interface(name)
+    except ValueError:
+        return False
+    return True
+
+def load_solver_tuning(path):
+    '''Returns the stored auto-tuning results ({model: {'settings', 'candidates'}}, {} if the file does not exist)'''
+    if path not in _solver_tunings:
+        _solver_tunings[path] = {}
+        if os.path.isfile(path):
+            with open(path, 'r') as file:
+                _solver_tunings[path] = json.load(file)
+    return _solver_tunings[path]
+
+def solver_settings(key, config=None):
+    '''Returns the solver settings of a model: config solver/default, the tuned choice (use_tuned) and solver/models/<key>'''
+    config = config if config is not None else load_config()
+    key = get_model_key(key, config) # model names and paths use the settings of their config key
+    solver_config = config.get('solver', {})
+    settings = dict(_default_solver_settings, **solver_config.get('default', {}))
+    if solver_config.get('use_tuned', False):
+        settings.update(load_solver_tuning(config['results']['solver_tuning']).get(key, {}).get('settings', {}))
+    settings.update((solver_config.get('models') or {}).get(key, {}))
+    return settings
+
+def configure_solver(model, settings):
+    '''Sets solver, presolve, LP method and timeout of the settings ('auto' keeps the current choice)'''
+    if settings['interface'] != 'auto':
+        interface = solver_interface(settings['interface'])
+        if model.solver.interface is not interface:
+            model.solver = interface
+    configuration = model.solver.configuration
+    configuration.presolve = settings['presolve']
+    configuration.timeout = settings['timeout']
+    lp_method = settings['lp_method']
+    if lp_method != 'auto':
+        if model.solver.interface.__name__ == 'optlang.glpk_interface':
+            import swiglpk # GLPK only (installed with the GLPK interface of optlang)
+            configuration._smcp.meth = getattr(swiglpk, _glpk_lp_methods[lp_method])
+        elif hasattr(configuration, 'lp_method'):
+            configuration.lp_method = lp_method
+        else:
+            raise ValueError(f'The LP method {lp_method} is not available for {model.solver.interface.__name__}')
+    model.solver_settings = dict(settings) # applied settings (see SweepEngine)
+    return model
+
+# Loading models (shared on-disk cache of parsed models)
+def _model_cache_file(model_path, cache_dir):
+    '''Returns the cache file of a model keyed by absolute path, file size, modification time and cobra version'''
+    stat = os.stat(model_path)
+    key = f'{os.path.abspath(model_path)}|{stat.st_size}|{stat.st_mtime_ns}|{cobra.__version__}'
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(cache_dir, f'{name}_{digest}.pkl')
+
+def _write_model_cache(model, cache_file):
+    '''Pickles the model to the cache file'''
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    # write to a temporary file first, parallel jobs may load the same model
+    tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+    with open(tmp_file, 'wb') as file:
+        pickle.dump(model, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+
+def model_file_hash(model_path):
+    '''Returns the sha1 digest of the content of a model file'''
+    digest = hashlib.sha1()
+    with open(model_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_model(key, config=None, use_cache=True, verbose=False):
+    '''Loads a model by config key, model name or path from the model cache (config: results/model_cache) and configures its solver'''
+    config = config if config is not None else load_config()
+    model_path = get_model_path(key, config)
+    cache_dir = config['results'].get('model_cache', '')
+    use_cache = use_cache and cache_dir != ''
+
+    start = time.perf_counter()
+    model = None
+    cache_file = _model_cache_file(model_path, cache_dir) if use_cache else ''
+    if use_cache and os.path.isfile(cache_file):
+        try:
+            with open(cache_file, 'rb') as file:
+                model = pickle.load(file)
+        except Exception:
+            # broken or incompatible cache file => parse the model again
+            model = None
+    cache_hit = model is not None
+
+    # the hash identifies the model file in the FVA store (see fva_store_key), it is stored in the cache entry
+    # (keyed by file size and modification time), cache files without it are written again
+    if not cache_hit or getattr(model, 'file_hash', None) is None:
+        if not cache_hit:
+            model = cobra.io.read_sbml_model(model_path)
+        model.file_hash = model_file_hash(model_path)
+        if use_cache:
+            _write_model_cache(model, cache_file)
+    configure_solver(model, solver_settings(key, config))
+
+    seconds = time.perf_counter() - start
+    _model_cache_timings.append({'model': key, 'path': model_path, 'cache_hit': cache_hit, 'seconds': seconds})
+    if verbose:
+        print(f'Loaded {key} in {seconds:.2f} s (cache {"hit" if cache_hit else "miss"})')
+    return model
+
+def load_prepared_model(key, descriptor, config=None, use_cache=True, verbose=False):
+    '''Loads a model prepared with a model descriptor (see prepare_model), the prepared model is cached as well'''
+    config = config if config is not None else load_config()
+    model_path = get_model_path(key, config)
+    cache_dir = config['results'].get('model_cache', '')
+    use_cache = use_cache and cache_dir != ''
+
+    start = time.perf_counter()
+    model = None
+    cache_file = ''
+    if use_cache:
+        preparation = {'profile': preparation_profile(descriptor, config), 'closed_reactions': descriptor.get('closed_reactions', []),
+                       'bounds': descriptor.get('bounds', {}), 'biomass': descriptor.get('biomass')}
+        digest = hashlib.sha1(json.dumps(preparation, sort_keys=True).encode()).hexdigest()[:16]
+        cache_file = f'{os.path.splitext(_model_cache_file(model_path, cache_dir))[0]}_prepared_{digest}.pkl'
+        if os.path.isfile(cache_file):
+            try:
+                with open(cache_file, 'rb') as file:
+                    model = pickle.load(file)
+            except Exception:
+                model = None
+    cache_hit = model is not None
+
+    if not cache_hit or getattr(model, 'file_hash', None) is None:
+        # the loaded model carries the hash of the model file (see load_model)
+        model = prepare_model(load_model(key, config, use_cache, verbose), descriptor, config)
+        if use_cache:
+            _write_model_cache(model, cache_file)
+    configure_solver(model, solver_settings(key, config))
+
+    seconds = time.perf_counter() - start
+    if cache_hit:
+        _model_cache_timings.append({'model': f'{key} (prepared)', 'path': model_path, 'cache_hit': cache_hit, 'seconds': seconds})
+        if verbose:
+            print(f'Loaded prepared {key} in {seconds:.2f} s (cache hit)')
+    return model
+
+def _model_state_digest(model):
+    '''Returns the sha1 digest of the model file hash (or the reactions), the bounds and the objective of the model'''
+    digest = hashlib.sha1()
+    file_hash = getattr(model, 'file_hash', None)
+    if file_hash is None:
+        file_hash = hashlib.sha1('\n'.join(f'{rxn.id}: {rxn.reaction}' for rxn in model.reactions).encode()).hexdigest()
+    digest.update(file_hash.encode())
+    digest.update(';'.join(f'{rxn.id}:{rxn.lower_bound!r}:{rxn.upper_bound!r}' for rxn in model.reactions).encode())
+    digest.update(f'{model.objective.direction}|{model.objective.expression}'.encode())
+    return digest
+
+_feasibility_statuses = {} # solver statuses of this process (see feasibility_status)
+
+def feasibility_status(model, patch=None, config=None):
+    '''Returns the solver status of one FBA of the model with the bounds of patch, cached per model state in the model cache'''
+    config = config if config is not None else load_config()
+    cache_dir = config['results'].get('model_cache', '')
+    with model:
+        for rxn_id, bounds in (patch or {}).items():
+            model.reactions.get_by_id(rxn_id).bounds = bounds
+        key = f'{_model_state_digest(model).hexdigest()}|{model.solver.interface.__name__}'
+        if key in _feasibility_statuses:
+            return _feasibility_statuses[key]
+        cache_file = os.path.join(cache_dir, 'feasibility', f'{hashlib.sha1(key.encode()).hexdigest()}.json') if cache_dir != '' else ''
+        if cache_file and os.path.isfile(cache_file):
+            try:
+                with open(cache_file, 'r') as file:
+                    _feasibility_statuses[key] = json.load(file)['status']
+                return _feasibility_statuses[key]
+            except (OSError, ValueError, KeyError):
+                pass
+        model.slim_optimize()
+        status = model.solver.status
+    _feasibility_statuses[key] = status
+    if cache_file:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w') as file:
+            json.dump({'key': key, 'status': status}, file)
+        os.replace(tmp_file, cache_file)
+    return status
+
+def model_cache_report(outpath='', sep=_sep):
+    '''Returns (and optionally stores) the load times of this process and prints the mean load time of cache hits and misses'''
+    report = pd.DataFrame(_model_cache_timings, columns=['model', 'path', 'cache_hit', 'seconds'])
+    for cache_hit, group in report.groupby('cache_hit'):
+        print(f'cache {"hit" if cache_hit else "miss"}: {len(group)} loads, mean {group.seconds.mean():.2f} s')
+    if outpath != '':
+        os.makedirs(os.path.dirname(outpath) or '.', exist_ok=True)
+        report.to_csv(outpath, sep=sep, index=False)
+    return report
+
+# Validating models (one validation pass shared by the error table and the numbers table)
+def validate_model(model_path, config=None):
+    '''Validates the SBML model and caches the parsed model, returns the model (None if not loadable) and the report'''
+    config = config if config is not None else load_config()
+    model, report = cobra.io.validate_sbml_model(model_path)
+    cache_dir = config['results'].get('model_cache', '')
+    if model is not None and cache_dir != '':
+        _write_model_cache(model, _model_cache_file(model_path, cache_dir))
+    return model, report
+
+def store_model_validation(validation, outpath):
+    '''Stores the validation results ({model_name: {'path', 'loadable', 'report'}}) as json file'''
+    os.makedirs(os.path.dirname(outpath) or '.', exist_ok=True)
+    with open(outpath, 'w') as file:
+        json.dump(validation, file, indent=1)
+
+def load_model_validation(path):
+    '''Loads the validation results written by run_model_validation.py'''
+    with open(path, 'r') as file:
+        return json.load(file)
+
+_validation_report_keys = ['SBML_FATAL', 'SBML_ERROR', 'SBML_SCHEMA_ERROR', 'SBML_WARNING', 'COBRA_FATAL', 'COBRA_ERROR', 'COBRA_WARNING', 'COBRA_CHECK']
+
+def _validation_worker(model_path, config, connection):
+    '''Validates one model in its own process and sends the result to the parent process'''
+    model, report = validate_model(model_path, config)
+    connection.send((model is not None, report))
+    connection.close()
+
+def _failed_validation_report(message):
+    '''Returns a validation report with the given message as COBRA_FATAL error'''
+    report = {key: [] for key in _validation_report_keys}
+    report['COBRA_FATAL'].append(message)
+    return report
+
+def validate_models_parallel(models, workers=1, timeout=600, config=None, verbose=False):
+    '''Validates the models ({model_name: model_path}) in one process each, timeouts and crashes are COBRA_FATAL errors'''
+    config = config if config is not None else load_config()
+    pending = list(models.items())
+    running = {} # model_name: (process, connection, start time)
+    validation = {}
+
+    def finish(model_name, loadable, report):
+        process, connection, start = running.pop(model_name)
+        connection.close()
+        process.join()
+        seconds = round(time.perf_counter() - start, 2)
+        validation[model_name] = {'path': models[model_name], 'loadable': loadable, 'report': report, 'seconds': seconds}
+        if verbose:
+            print(f'{model_name} validated in {seconds} s')
+
+    while pending or running:
+        # start new processes
+        while pending and len(running) < max(1, workers):
+            model_name, model_path = pending.pop(0)
+            parent_connection, child_connection = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_validation_worker, args=(model_path, config, child_connection), daemon=True)
+            process.start()
+            child_connection.close()
+            running[model_name] = (process, parent_connection, time.perf_counter())
+
+        # collect finished, crashed and timed out processes
+        for model_name, (process, connection, start) in list(running.items()):
+            alive = process.is_alive()
+            if connection.poll():
+                try:
+                    finish(model_name, *connection.recv())
+                    continue
+                except EOFError:
+                    alive = False
+            if not alive:
+                # the result can arrive between the poll and the exit of the process
+                process.join()
+                result = None
+                if process.exitcode == 0 and connection.poll():
+                    try:
+                        result = connection.recv()
+                    except EOFError:
+                        pass
+                finish(model_name, *(result or (False, _failed_validation_report(f'validation process crashed (exit code {process.exitcode})'))))
+            elif time.perf_counter() - start > timeout:
+                process.terminate()
+                finish(model_name, False, _failed_validation_report(f'validation timed out after {timeout} s'))
+        time.sleep(0.05)
+
+    # keep the order of the given models
+    return {model_name: validation[model_name] for model_name in models}
+
+# Sweeps over exchange bounds (phenotype phase planes and other condition grids)
+def axis_bounds(value, sign=1, bound_type='fixed'):
+    '''Returns the reaction bounds of a sweep axis value: 'fixed' => (sign * value, sign * value), 'symmetric' => (-value, value)'''
+    if bound_type == 'fixed':
+        return (sign * value, sign * value)
+    return (-value, value)
+
+class SweepEngine:
+    '''Solves the model for many points of a sweep on one warm started LP (only the bounds of the axis reactions change)
+    @params: axes: list of dicts with 'rxn', 'sign' and 'bounds' ('fixed' or 'symmetric'), mode: fba, pfba or two_stage'''
+
+    modes = ('fba', 'pfba', 'two_stage')
+    objective_slack = 1e-6 # relative relaxation of the fixed objective, if the pFBA stage is infeasible
+
+    def __init__(self, model, axes, objective, mode='pfba', fraction_of_optimum=1.0, growth_tolerance=1e-9, solve_timeout=None):
+        if mode not in self.modes:
+            raise ValueError(f'Unknown sweep mode {mode}, use one of {self.modes}')
+        self.mode = mode
+        self.axes = [dict(axis, sign=axis.get('sign', 1), bounds=axis.get('bounds', 'fixed')) for axis in axes]
+        self.fraction_of_optimum = fraction_of_optimum
+        self.growth_tolerance = growth_tolerance
+        self.objective = objective
+        # solver settings of the model (see configure_solver), solve_timeout replaces their timeout
+        self.solver_settings = dict(getattr(model, 'solver_settings', dict(_default_solver_settings, interface='auto')))
+        if solve_timeout is not None:
+            self.solver_settings['timeout'] = solve_timeout
+        self.solve_timeout = self.solver_settings['timeout']
+        self.lp_solves = 0
+
+        # stage 1: maximize the objective reaction
+        self.fba_model = model.copy()
+        self.fba_model.objective = objective
+        self._configure_solver(self.fba_model)
+        self._fba_rxns = self._get_reactions(self.fba_model)
+        self._fba_objective = self.fba_model.reactions.get_by_id(objective)
+        # bounds of the prepared model, restored after every task (see reset)
+        self._initial_bounds = [rxn.bounds for rxn in self._fba_rxns]
+
+        # stage 2: minimize the total flux with the objective fixed to the optimum of stage 1 (objective is built only once)
+        self.pfba_model = None
+        if mode != 'fba':
+            from optlang.symbolics import Zero # pFBA objective (optlang is loaded with cobra)
+            self.pfba_model = model.copy()
+            self._configure_solver(self.pfba_model)
+            variables = [variable for rxn in self.pfba_model.reactions for variable in (rxn.forward_variable, rxn.reverse_variable)]
+            self.pfba_model.objective = self.pfba_model.problem.Objective(Zero, direction='min', sloppy=True)
+            self.pfba_model.objective.set_linear_coefficients({variable: 1.0 for variable in variables})
+            self._pfba_rxns = self._get_reactions(self.pfba_model)
+            self._pfba_objective = self.pfba_model.reactions.get_by_id(objective)
+            self._objective_bounds = self._pfba_objective.bounds
+
+    def _get_reactions(self, model):
+        return [model.reactions.get_by_id(axis['rxn']) for axis in self.axes]
+
+    def _set_point(self, rxns, values):
+        for rxn, axis, value in zip(rxns, self.axes, values):
+            rxn.bounds = axis_bounds(value, axis['sign'], axis['bounds'])
+
+    def _configure_solver(self, model):
+        '''Applies the solver settings of the model, lp_method 'auto' uses the dual simplex of GLPK (only bounds change between the points)'''
+        configure_solver(model, self.solver_settings)
+        if self.solver_settings['lp_method'] == 'auto' and model.solver.interface.__name__ == 'optlang.glpk_interface':
+            from swiglpk import GLP_DUALP # GLPK only
+            model.solver.configuration._smcp.meth = GLP_DUALP
+
+    def _optimize(self, model):
+        '''Solves the model warm started, a timed-out solve (stalled basis) is repeated once from a fresh basis'''
+        value = model.slim_optimize(error_value=np.nan)
+        self.lp_solves += 1
+        if model.solver.status == 'time_limit':
+            if model.solver.interface.__name__ == 'optlang.glpk_interface':
+                from swiglpk import glp_adv_basis # GLPK only
+                glp_adv_basis(model.solver.problem, 0)
+            value = model.slim_optimize(error_value=np.nan)
+            self.lp_solves += 1
+        return value
+
+    def reset(self):
+        '''Restores the bounds of the axis reactions (and the objective reaction) of the prepared model'''
+        for rxn, bounds in zip(self._fba_rxns, self._initial_bounds):
+            rxn.bounds = bounds
+        if self.pfba_model is not None:
+            for rxn, bounds in zip(self._pfba_rxns, self._initial_bounds):
+                rxn.bounds = bounds
+            self._pfba_objective.bounds = self._objective_bounds
+
+    def _needs_pfba(self, growth):
+        return self.mode == 'pfba' or (self.mode == 'two_stage' and growth > self.growth_tolerance)
+
+    def _solve_pfba(self, growth):
+        '''Minimizes the total flux with the objective fixed to the optimum of stage 1, returns the total flux (nan if infeasible)'''
+        lower_bound, upper_bound = self._objective_bounds
+        minimal_growth = max(lower_bound, min(growth * self.fraction_of_optimum, upper_bound))
+        self._pfba_objective.bounds = (minimal_growth, upper_bound)
+        total_flux = self._optimize(self.pfba_model)
+        if np.isnan(total_flux):
+            # the optimum of stage 1 can lie above the optimum of stage 2 (solver tolerances)
+            self._pfba_objective.lower_bound = max(lower_bound, minimal_growth - self.objective_slack * max(1.0, growth))
+            total_flux = self._optimize(self.pfba_model)
+        return total_flux
+
+    def solve_point(self, values):
+        '''Returns the objective flux and the reduced costs of the axis reactions of one point'''
+        self._set_point(self._fba_rxns, values)
+        growth = self._optimize(self.fba_model)
+        if np.isnan(growth):
+            return 0.0, tuple(np.nan for _ in self.axes)
+        signature = tuple(rxn.reduced_cost for rxn in self._fba_rxns)
+
+        if not self._needs_pfba(growth):
+            return growth, signature
+
+        self._set_point(self._pfba_rxns, values)
+        if np.isnan(self._solve_pfba(growth)):
+            return 0.0, signature
+        return self._pfba_objective.flux, signature
+
+    @staticmethod
+    def _apply_patch(model, patch):
+        '''Sets the bounds of a patch ({reaction id: (lower bound, upper bound)}) and returns the previous bounds'''
+        previous = {}
+        for rxn_id, bounds in patch.items():
+            rxn = model.reactions.get_by_id(rxn_id)
+            previous[rxn_id] = rxn.bounds
+            rxn.bounds = bounds
+        return previous
+
+    @staticmethod
+    def _fluxes(model, reactions):
+        '''Returns the fluxes of the reaction ids of the last solution (forward - reverse variable)'''
+        primal_values = model.solver.primal_values
+        return np.array([primal_values[rxn_id] - primal_values[model.reactions.get_by_id(rxn_id).reverse_id] for rxn_id in reactions])
+
+    def solve_patch(self, patch, reactions=()):
+        '''Solves the model with the bounds of patch and returns the objective flux and the fluxes of the reactions'''
+        fba_previous = self._apply_patch(self.fba_model, patch)
+        pfba_previous = self._apply_patch(self.pfba_model, patch) if self.pfba_model is not None else {}
+        try:
+            growth = self._optimize(self.fba_model)
+            if np.isnan(growth):
+                return 0.0, np.full(len(reactions), np.nan)
+            model = self.fba_model
+            if self._needs_pfba(growth):
+                if np.isnan(self._solve_pfba(growth)):
+                    return 0.0, np.full(len(reactions), np.nan)
+                model = self.pfba_model
+                growth = self._pfba_objective.flux
+            return growth, self._fluxes(model, reactions)
+        finally:
+            self._apply_patch(self.fba_model, fba_previous)
+            if self.pfba_model is not None:
+                self._apply_patch(self.pfba_model, pfba_previous)
+                self._pfba_objective.bounds = self._objective_bounds
+
+    def solve_line(self, fixed_values, last_values, reverse=False):
+        '''Solves all points along the last axis (reverse: from the last point)'''
+        growth = np.zeros(len(last_values))
+        signature = np.full((len(last_values), len(self.axes)), np.nan)
+        order = range(len(last_values) - 1, -1, -1) if reverse else range(len(last_values))
+        for j in order:
+            growth[j], signature[j] = self.solve_point(tuple(fixed_values) + (last_values[j],))
+        return growth, signature
+
+class PhPPEngine(SweepEngine):
+    '''Sweep engine of a phenotype phase plane (e.g. glucose vs. oxygen uptake)'''
+
+    def __init__(self, model, x_rxn, y_rxn, biomass_rxn, mode='pfba', x_sign=1, y_sign=1, x_bounds='fixed', y_bounds='symmetric', fraction_of_optimum=1.0, growth_tolerance=1e-9, solve_timeout=None):
+        axes = [{'rxn': x_rxn, 'sign': x_sign, 'bounds': x_bounds}, {'rxn': y_rxn, 'sign': y_sign, 'bounds': y_bounds}]
+        super().__init__(model, axes, biomass_rxn, mode, fraction_of_optimum, growth_tolerance, solve_timeout)
+
+    def solve_row(self, x, y_values, reverse=False):
+        '''Solves all points of one row (fixed x value)'''
+        return self.solve_line((x,), y_values, reverse)
+
+    def solve_grid(self, x_values, y_values):
+        '''Returns the growth matrix (len(x_values) x len(y_values)) and the shadow price signatures (... x 2)'''
+        growth = np.zeros((len(x_values), len(y_values)))
+        signature = np.full((len(x_values), len(y_values), 2), np.nan)
+        for i, x in enumerate(x_values):
+            growth[i], signature[i] = self.solve_row(x, y_values, reverse=(i % 2 == 1))
+        self.reset()
+        return growth, signature
+
+def _sweep_model(model_key, prepare=None, config=None):
+    '''Returns the model of a sweep: a model object or the model of a key prepared with prepare (function or model descriptor)'''
+    if isinstance(model_key, str):
+        if isinstance(prepare, dict):
+            return load_prepared_model(model_key, prepare, config)
+        model = load_model(model_key, config)
+        if prepare is not None:
+            prepare(model)
+        return model
+    return model_key
+
+_sweep_worker = {} # engine and shared result arrays of a sweep worker process (see sweep)
+
+def _attach_shared_memory(shm_name):
+    '''Attaches a shared memory block of the parent process without registering it with the resource tracker (only the parent unlinks it)'''
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=shm_name, track=False)
+    # unregistering after the attach would also drop the registration of the parent (shared resource tracker)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=shm_name)
+    finally:
+        resource_tracker.register = register
+
+def _sweep_worker_init(model_key, axes, objective, prepare, config, shared, engine_kwargs):
+    '''Builds the sweep engine once per worker process and attaches the shared result arrays'''
+    model = _sweep_model(model_key, prepare, config)
+    _sweep_worker['engine'] = SweepEngine(model, [{key: value for key, value in axis.items() if key != 'values'} for axis in axes], objective, **engine_kwargs)
+    _sweep_worker['values'] = [np.asarray(axis['values'], dtype=float) for axis in axes]
+    _sweep_worker['memory'] = []
+    for name, (shm_name, shape) in shared.items():
+        memory = _attach_shared_memory(shm_name)
+        _sweep_worker['memory'].append(memory)
+        _sweep_worker[name] = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+
+def _sweep_worker_task(task):
+    '''Solves one line along the last axis into the shared arrays'''
+    index, reverse = task
+    engine, values = _sweep_worker['engine'], _sweep_worker['values']
+    fixed_values = tuple(axis_values[i] for axis_values, i in zip(values[:-1], index))
+    growth, signature = engine.solve_line(fixed_values, values[-1], reverse)
+    engine.reset()
+    _sweep_worker['growth'][index] = growth
+    _sweep_worker['signature'][index] = signature
+    return engine.lp_solves
+
+def sweep(model_key, axes, objective, workers=1, mode='fba', prepare=None, config=None, verbose=False, **engine_kwargs):
+    '''Solves the model for every combination of the axis values (see SweepEngine) in workers processes
+    Returns the objective fluxes and the shadow price signatures'''
+    shape = tuple(len(axis['values']) for axis in axes)
+    start = time.perf_counter()
+    tasks = [(index, k % 2 == 1) for k, index in enumerate(np.ndindex(shape[:-1]))]
+
+    if workers <= 1:
+        model = _sweep_model(model_key, prepare, config)
+        engine = SweepEngine(model, [{key: value for key, value in axis.items() if key != 'values'} for axis in axes], objective, mode, **engine_kwargs)
+        values = [np.asarray(axis['values'], dtype=float) for axis in axes]
+        growth = np.zeros(shape)
+        signature = np.full(shape + (len(axes),), np.nan)
+        for index, reverse in tasks:
+            growth[index], signature[index] = engine.solve_line(tuple(axis_values[i] for axis_values, i in zip(values[:-1], index)), values[-1], reverse)
+        engine.reset()
+    else:
+        shapes = {'growth': shape, 'signature': shape + (len(axes),)}
+        memories = {name: shared_memory.SharedMemory(create=True, size=max(8, int(np.prod(array_shape)) * 8)) for name, array_shape in shapes.items()}
+        try:
+            shared = {name: (memories[name].name, array_shape) for name, array_shape in shapes.items()}
+            np.ndarray(shapes['growth'], dtype=np.float64, buffer=memories['growth'].buf)[...] = 0
+            np.ndarray(shapes['signature'], dtype=np.float64, buffer=memories['signature'].buf)[...] = np.nan
+            engine_kwargs = dict(engine_kwargs, mode=mode)
+            with multiprocessing.Pool(processes=workers, initializer=_sweep_worker_init, initargs=(model_key, axes, objective, prepare, config, shared, engine_kwargs)) as pool:
+                # consecutive lines per worker keep the warm start between the lines
+                for _ in pool.imap_unordered(_sweep_worker_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))):
+                    pass
+            growth = np.ndarray(shapes['growth'], dtype=np.float64, buffer=memories['growth'].buf).copy()
+            signature = np.ndarray(shapes['signature'], dtype=np.float64, buffer=memories['signature'].buf).copy()
+        finally:
+            for memory in memories.values():
+                memory.close()
+                memory.unlink()
+    if verbose:
+        print(f'sweep with {growth.size} points computed in {time.perf_counter() - start:.2f} s')
+    return growth, signature
+
+def phenotype_phase_plane(model, x_rxn, y_rxn, biomass_rxn, x_values, y_values, workers=1, verbose=False, mode='pfba', x_sign=1, y_sign=1, x_bounds='fixed', y_bounds='symmetric', prepare=None, config=None, **engine_kwargs):
+    '''Computes the phenotype phase plane of the model with sweep, returns the growth matrix and the signatures'''
+    axes = [{'rxn': x_rxn, 'values': x_values, 'sign': x_sign, 'bounds': x_bounds}, {'rxn': y_rxn, 'values': y_values, 'sign': y_sign, 'bounds': y_bounds}]
+    return sweep(model, axes, biomass_rxn, workers, mode, prepare, config, verbose, **engine_kwargs)
+
+_phpp_engine = None # engine of an adaptive PhPP worker process
+
+def _phpp_worker_init(model_key, prepare, config, engine_kwargs):
+    '''Builds the PhPP engine once per worker process'''
+    global _phpp_engine
+    _phpp_engine = PhPPEngine(_sweep_model(model_key, prepare, config), **engine_kwargs)
+
+def _phpp_worker_points(points):
+    '''Solves a list of (x, y) points with the engine of the worker'''
+    results = [_phpp_engine.solve_point(point) for point in points]
+    _phpp_engine.reset()
+    return results
+
+def _coarse_indices(length, step):
+    '''Returns every step-th index including the last one'''
+    indices = list(range(0, length, step))
+    if indices[-1] != length - 1:
+        indices.append(length - 1)
+    return indices
+
+def adaptive_phenotype_phase_plane(model, x_rxn, y_rxn, biomass_rxn, x_values, y_values, initial_step=8, workers=1, signature_decimals=6, growth_tolerance=1e-6, verbose=False, prepare=None, config=None, **engine_kwargs):
+    '''Computes the growth matrix of phenotype_phase_plane, only cells whose corners differ in their phase are refined
+    Returns the growth matrix and the solved points (x, y, growth, x reduced cost, y reduced cost)'''
+    x_values, y_values = np.asarray(x_values, dtype=float), np.asarray(y_values, dtype=float)
+    n, m = len(x_values), len(y_values)
+    start = time.perf_counter()
+    solved = {} # (i, j): (growth, (x reduced cost, y reduced cost))
+
+    engine_kwargs = dict(engine_kwargs, x_rxn=x_rxn, y_rxn=y_rxn, biomass_rxn=biomass_rxn)
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(processes=workers, initializer=_phpp_worker_init, initargs=(model, prepare, config, engine_kwargs))
+    else:
+        engine = PhPPEngine(_sweep_model(model, prepare, config), **engine_kwargs)
+
+    def solve(indices):
+        # serpentine order keeps consecutive points neighbours (warm start)
+        indices = sorted(set(indices) - set(solved), key=lambda ij: (ij[0], ij[1] if ij[0] % 2 == 0 else -ij[1]))
+        if not indices:
+            return
+        points = [(x_values[i], y_values[j]) for i, j in indices]
+        if pool is None:
+            results = [engine.solve_point(point) for point in points]
+        else:
+            chunks = np.array_split(np.arange(len(points)), workers)
+            results = [result for chunk_results in pool.map(_phpp_worker_points, [[points[k] for k in chunk] for chunk in chunks if len(chunk) > 0]) for result in chunk_results]
+        solved.update(zip(indices, results))
+
+    def uniform(i0, i1, j0, j1):
+        corners = [solved[(i0, j0)], solved[(i0, j1)], solved[(i1, j0)], solved[(i1, j1)]]
+        signatures = np.round(np.array([signature for _, signature in corners], dtype=float), signature_decimals)
+        if not np.allclose(signatures, signatures[0], rtol=0, atol=10**-signature_decimals, equal_nan=True):
+            return False
+        g00, g01, g10, g11 = [growth for growth, _ in corners]
+        return abs(g00 + g11 - g01 - g10) <= growth_tolerance
+
+    growth = np.zeros((n, m))
+    i_coarse, j_coarse = _coarse_indices(n, initial_step), _coarse_indices(m, initial_step)
+    solve([(i, j) for i in i_coarse for j in j_coarse])
+    cells = [(i0, i1, j0, j1) for i0, i1 in zip(i_coarse, i_coarse[1:]) for j0, j1 in zip(j_coarse, j_coarse[1:])]
+    if n == 1 or m == 1:
+        cells = []
+
+    while cells:
+        children = []
+        for i0, i1, j0, j1 in cells:
+            if uniform(i0, i1, j0, j1):
+                # bilinear interpolation (exact, growth is affine within a phase)
+                tx = ((x_values[i0:i1 + 1] - x_values[i0]) / (x_values[i1] - x_values[i0]))[:, None]
+                ty = ((y_values[j0:j1 + 1] - y_values[j0]) / (y_values[j1] - y_values[j0]))[None, :]
+                g00, g01, g10, g11 = solved[(i0, j0)][0], solved[(i0, j1)][0], solved[(i1, j0)][0], solved[(i1, j1)][0]
+                growth[i0:i1 + 1, j0:j1 + 1] = g00 * (1 - tx) * (1 - ty) + g01 * (1 - tx) * ty + g10 * tx * (1 - ty) + g11 * tx * ty
+                continue
+            if i1 - i0 <= 1 and j1 - j0 <= 1:
+                # smallest cell: all points are solved
+                continue
+            i_split = [i0, (i0 + i1) // 2, i1] if i1 - i0 > 1 else [i0, i1]
+            j_split = [j0, (j0 + j1) // 2, j1] if j1 - j0 > 1 else [j0, j1]
+            children += [(a0, a1, b0, b1) for a0, a1 in zip(i_split, i_split[1:]) for b0, b1 in zip(j_split, j_split[1:])]
+        solve([(i, j) for i0, i1, j0, j1 in children for i in (i0, i1) for j in (j0, j1)])
+        cells = children
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    # solved points are exact
+    points = np.zeros((len(solved), 5))
+    for k, ((i, j), (point_growth, signature)) in enumerate(solved.items()):
+        growth[i, j] = point_growth
+        points[k] = (x_values[i], y_values[j], point_growth, signature[0], signature[1])
+    if verbose:
+        print(f'adaptive PhPP: {len(solved)} of {n * m} points solved ({100 * len(solved) / (n * m):.1f} %) in {time.perf_counter() - start:.2f} s')
+    return growth, points
+
+def save_phpp(outfile, growth, points=None):
+    '''Stores the growth matrix (.npy) and, if given, the solved points of the adaptive sampling (<outfile>_points.npy)'''
+    outfile = outfile if outfile.endswith('.npy') else f'{outfile}.npy'
+    os.makedirs(os.path.dirname(outfile) or '.', exist_ok=True)
+    np.save(outfile, growth)
+    if points is not None:
+        np.save(f'{outfile[:-len(".npy")]}_points.npy', points)
+
+# Bound patches (many conditions of one model, e.g. carbon source screening)
+_patch_worker = {} # engine and shared result arrays of a patch worker process (see solve_patches)
+
+def _patch_engine(model_key, objective, prepare=None, base=None, config=None, **engine_kwargs):
+    '''Returns the engine of solve_patches: the model (see _sweep_model) with the base patch applied permanently'''
+    model = _sweep_model(model_key, prepare, config)
+    # the engine copies the model, the base patch of a given model object is reverted afterwards
+    with model:
+        if base:
+            SweepEngine._apply_patch(model, base)
+        return SweepEngine(model, [], objective, **engine_kwargs)
+
+def _patch_worker_init(model_key, objective, prepare, base, config, patches, reactions, shared, engine_kwargs):
+    '''Builds the engine once per worker process and attaches the shared result arrays'''
+    _patch_worker['engine'] = _patch_engine(model_key, objective, prepare, base, config, **engine_kwargs)
+    _patch_worker['patches'] = patches
+    _patch_worker['reactions'] = reactions
+    _patch_worker['memory'] = []
+    for name, (shm_name, shape) in shared.items():
+        memory = _attach_shared_memory(shm_name)
+        _patch_worker['memory'].append(memory)
+        _patch_worker[name] = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+
+def _patch_worker_task(chunk):
+    '''Solves a chunk (start, stop) of the patches and writes the results into the shared arrays'''
+    start, stop = chunk
+    engine = _patch_worker['engine']
+    for index in range(start, stop):
+        _patch_worker['growth'][index], _patch_worker['fluxes'][index] = engine.solve_patch(_patch_worker['patches'][index], _patch_worker['reactions'])
+    return engine.lp_solves
+
+def solve_patches(model_key, patches, objective, reactions=(), workers=1, mode='pfba', prepare=None, base=None, config=None, chunk_size=16, verbose=False, **engine_kwargs):
+    '''Solves the model for every bound patch ({reaction id: (lower bound, upper bound)}) in workers processes
+    Returns the objective fluxes and the fluxes of the given reactions'''
+    start = time.perf_counter()
+    reactions = list(reactions)
+    shapes = {'growth': (len(patches),), 'fluxes': (len(patches), len(reactions))}
+    if workers <= 1 or len(patches) <= chunk_size:
+        engine = _patch_engine(model_key, objective, prepare, base, config, mode=mode, **engine_kwargs)
+        growth = np.zeros(shapes['growth'])
+        fluxes = np.full(shapes['fluxes'], np.nan)
+        for index, patch in enumerate(patches):
+            growth[index], fluxes[index] = engine.solve_patch(patch, reactions)
+    else:
+        memories = {name: shared_memory.SharedMemory(create=True, size=max(8, int(np.prod(shape)) * 8)) for name, shape in shapes.items()}
+        try:
+            shared = {name: (memories[name].name, shape) for name, shape in shapes.items()}
+            np.ndarray(shapes['growth'], dtype=np.float64, buffer=memories['growth'].buf)[...] = 0
+            np.ndarray(shapes['fluxes'], dtype=np.float64, buffer=memories['fluxes'].buf)[...] = np.nan
+            chunks = [(chunk_start, min(chunk_start + chunk_size, len(patches))) for chunk_start in range(0, len(patches), chunk_size)]
+            engine_kwargs = dict(engine_kwargs, mode=mode)
+            with multiprocessing.Pool(processes=min(workers, len(chunks)), initializer=_patch_worker_init, initargs=(model_key, objective, prepare, base, config, patches, reactions, shared, engine_kwargs)) as pool:
+                for _ in pool.imap_unordered(_patch_worker_task, chunks):
+                    pass
+            growth = np.ndarray(shapes['growth'], dtype=np.float64, buffer=memories['growth'].buf).copy()
+            fluxes = np.ndarray(shapes['fluxes'], dtype=np.float64, buffer=memories['fluxes'].buf).copy()
+        finally:
+            for memory in memories.values():
+                memory.close()
+                memory.unlink()
+    if verbose:
+        print(f'{len(patches)} patches solved in {time.perf_counter() - start:.2f} s')
+    return growth, fluxes
+
+class BatchPFBA:
+    '''pFBA (like cobra.flux_analysis.pfba) of many bound patches of one model on one warm started LP'''
+
+    def __init__(self, model, objective=None, fraction_of_optimum=1.0, solve_timeout=None):
+        if objective is None:
+            objective = next(iter(cobra.util.solver.linear_reaction_coefficients(model))).id
+        self.objective = objective
+        self.reactions = [rxn.id for rxn in model.reactions]
+        self.engine = SweepEngine(model, [], objective, mode='pfba', fraction_of_optimum=fraction_of_optimum, solve_timeout=solve_timeout)
+
+    def solve(self, patches, reactions=None):
+        '''Solves every bound patch (list or {condition: patch}) and returns the fluxes as dataframe (index: conditions)'''
+        conditions = list(patches) if isinstance(patches, dict) else list(range(len(patches)))
+        patches = list(patches.values()) if isinstance(patches, dict) else list(patches)
+        reactions = self.reactions if reactions is None else list(reactions)
+        fluxes = np.full((len(patches), len(reactions)), np.nan)
+        for index, patch in enumerate(patches):
+            _, fluxes[index] = self.engine.solve_patch(patch, reactions)
+        return pd.DataFrame(fluxes, index=pd.Index(conditions, name='condition'), columns=pd.Index(reactions, name='reaction'))
+
+def uptake_bounds(rxn, uptake, fixed=False):
+    '''Returns the bounds of an exchange reaction which allow an uptake up to uptake (fixed: the uptake is fixed)'''
+    if next(iter(rxn.metabolites.values())) < 0:
+        return (-uptake, -uptake) if fixed else (-uptake, max(rxn.upper_bound, 0))
+    return (uptake, uptake) if fixed else (min(rxn.lower_bound, 0), uptake)
+
+def _carbon_atoms(metabolite):
+    '''Returns the number of carbon atoms of a metabolite from its formula or its name suffix (None if unknown)'''
+    formula = metabolite.formula
+    if not formula:
+        formula = metabolite.name.rsplit('_', 1)[-1] if '_' in metabolite.name else ''
+        if not re.fullmatch(r'([A-Z][a-z]?\d*)+', formula):
+            return None
+    try:
+        elements = cobra.Metabolite(formula=formula).elements
+    except Exception:
+        return None
+    return None if elements is None else elements.get('C', 0)
+
+def carbon_exchange_reactions(model, candidates=None, exclude=()):
+    '''Returns {exchange reaction id: number of carbon atoms} of the carbon exchanges (default: all) without the excluded ones'''
+    if candidates is None:
+        sources = {rxn.id: _carbon_atoms(next(iter(rxn.metabolites))) for rxn in model.exchanges}
+        sources = {rxn_id: carbon_atoms for rxn_id, carbon_atoms in sources.items() if carbon_atoms}
+    else:
+        sources = {rxn_id: _carbon_atoms(next(iter(model.reactions.get_by_id(rxn_id).metabolites))) for rxn_id in candidates}
+    return {rxn_id: carbon_atoms for rxn_id, carbon_atoms in sources.items() if rxn_id not in exclude}
+
+def carbon_screen(model_key, descriptor, sources=None, carbon_mmol=1000, default_uptake=10, workers=1, mode='pfba', config=None, verbose=False):
+    '''Computes growth rate and biomass yield of the model on every carbon source (carbon_mmol carbon uptake each)
+    Returns a dataframe with metabolite, carbon_atoms, uptake, growth and yield'''
+    config = config if config is not None else load_config()
+    model = _sweep_model(model_key, descriptor, config)
+    if sources is None:
+        sources = carbon_exchange_reactions(model, descriptor.get('carbon_exchanges'), descriptor.get('exclude', []))
+    rxns = [model.reactions.get_by_id(rxn_id) for rxn_id in sources]
+    uptakes = [carbon_mmol / carbon_atoms if carbon_atoms else default_uptake for carbon_atoms in sources.values()]
+    base = {rxn.id: uptake_bounds(rxn, 0) for rxn in rxns}
+    patches = [{rxn.id: uptake_bounds(rxn, uptake)} for rxn, uptake in zip(rxns, uptakes)]
+
+    # serial: the prepared model is used directly, parallel: every worker loads the prepared model from the model cache
+    growth, _ = solve_patches(model if workers <= 1 else model_key, patches, descriptor['biomass'], workers=workers, mode=mode,
+                              prepare=descriptor, base=base, config=config, verbose=verbose)
+    screen = pd.DataFrame({
+        'metabolite': [next(iter(rxn.metabolites)).name for rxn in rxns],
+        'carbon_atoms': [np.nan if carbon_atoms is None else carbon_atoms for carbon_atoms in sources.values()],
+        'uptake': uptakes,
+        'growth': growth,
+    }, index=pd.Index([rxn.id for rxn in rxns], name='reaction'))
+    screen['yield'] = screen.growth / screen.uptake
+    return screen
+
+# Benchmark of the growth simulations (load, preparation and solve times, LP iterations and RSS)
+def lp_iterations(model):
+    '''Returns the number of simplex iterations of the LP of the model so far (GLPK only, otherwise None)'''
+    if model.solver.interface.__name__ == 'optlang.glpk_interface':
+        from swiglpk import glp_get_it_cnt # GLPK only
+        return glp_get_it_cnt(model.solver.problem)
+    return None
+
+def dataset_patches(model, descriptor, dataset):
+    '''Returns the bound patches of every condition of the dataset (exchange reactions: 'uptakes' of the descriptor)'''
+    uptakes = {model.reactions.get_by_id(descriptor['uptakes'][role]): values for role, values in dataset['uptakes'].items()}
+    return [{rxn.id: uptake_bounds(rxn, values[index], dataset.get('fixed_uptakes', False)) for rxn, values in uptakes.items()}
+            for index in range(len(dataset['growth']))]
+
+def growth_benchmark(model_key, descriptor, dataset, config=None):
+    '''Simulates the growth of the model on every condition of the dataset with pFBA and times the stages
+    Returns the stage seconds, solver statistics, the simulated growth rates and their RSS'''
+    config = config if config is not None else load_config()
+    record = {}
+    start = time.perf_counter()
+    model = load_model(model_key, config)
+    record['load_s'] = time.perf_counter() - start
+    record['cache_hit'] = bool(_model_cache_timings[-1]['cache_hit'])
+    record['solver'] = model.solver.interface.__name__
+
+    start = time.perf_counter()
+    prepare_model(model, descriptor, config)
+    record['prepare_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = BatchPFBA(model, descriptor['biomass'])
+    record['build_s'] = time.perf_counter() - start
+
+    patches = dataset_patches(model, descriptor, dataset)
+    lp_models = (batch.engine.fba_model, batch.engine.pfba_model)
+    iterations = [lp_iterations(lp_model) for lp_model in lp_models]
+    start = time.perf_counter()
+    fluxes = batch.solve(patches, [descriptor['biomass']])
+    record['solve_s'] = time.perf_counter() - start
+    record['lp_solves'] = batch.engine.lp_solves
+    record['lp_iterations'] = None if None in iterations else int(sum(lp_iterations(lp_model) - before for lp_model, before in zip(lp_models, iterations)))
+
+    growth = fluxes[descriptor['biomass']].fillna(0).to_numpy()
+    record['growth'] = growth.tolist()
+    record['rss'] = float(np.sum(np.square(growth - np.asarray(dataset['growth'], dtype=float))))
+    return record
+
+benchmark_stages = ('load_s', 'prepare_s', 'build_s', 'solve_s')
+
+def load_benchmark_history(path):
+    '''Returns the stored benchmark runs (list of dicts, oldest first, [] if the file does not exist)'''
+    if not os.path.isfile(path):
+        return []
+    with open(path, 'r') as file:
+        return json.load(file)
+
+def store_benchmark_history(history, path):
+    '''Stores the benchmark runs as json file'''
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_file = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_file, 'w') as file:
+        json.dump(history, file, indent=1)
+    os.replace(tmp_file, path)
+
+def benchmark_regressions(history, run, tolerance=0.25, window=5, min_seconds=0.05, min_runs=3):
+    '''Returns the stages of the run which are slower than (1 + tolerance) times the median of the last comparable runs'''
+    previous = [old_run for old_run in history if old_run['solver'] == run['solver'] and old_run['cobra'] == run['cobra']][-window:]
+    regressions = []
+    for model_key, record in run['models'].items():
+        for stage in benchmark_stages:
+            # load times are only comparable between model cache hits (or misses)
+            times = [old_run['models'][model_key][stage] for old_run in previous if model_key in old_run['models']
+                     and old_run['models'][model_key].get('solver') == record.get('solver')
+                     and (stage != 'load_s' or old_run['models'][model_key]['cache_hit'] == record['cache_hit'])]
+            if len(times) < min_runs:
+                continue
+            baseline = float(np.median(times))
+            if record[stage] > (1 + tolerance) * baseline and record[stage] - baseline >= min_seconds:
+                regressions.append({'model': model_key, 'stage': stage, 'seconds': record[stage], 'baseline': baseline,
+                                    'ratio': record[stage] / baseline if baseline > 0 else np.inf})
+    return regressions
+
+# Auto-tuning of the solver settings (FBA, pFBA and FVA of every candidate in its own process)
+def _fva_reaction_sample(model, number):
+    '''Returns the ids of number reactions evenly spread over the model (FVA of the auto-tuning)'''
+    step = max(1, len(model.reactions) // max(1, number))
+    return [rxn.id for rxn in model.reactions[::step][:number]]
+
+def solver_timings(model, settings, fva_reactions=100, repeats=3):
+    '''Times FBA, pFBA and FVA of the model with the solver settings (fastest of repeats)'''
+    reactions = _fva_reaction_sample(model, fva_reactions)
+    record = {'fba_s': np.inf, 'pfba_s': np.inf, 'fva_s': np.inf, 'statuses': [], 'growth': [], 'total_flux': [], 'fva': []}
+    for _ in range(repeats):
+        lp_model = configure_solver(model.copy(), settings)
+        start = time.perf_counter()
+        record['growth'].append(lp_model.slim_optimize(error_value=np.nan))
+        record['fba_s'] = min(record['fba_s'], time.perf_counter() - start)
+        record['statuses'].append(lp_model.solver.status)
+
+        start = time.perf_counter()
+        solution = cobra.flux_analysis.pfba(lp_model)
+        record['pfba_s'] = min(record['pfba_s'], time.perf_counter() - start)
+        record['statuses'].append(solution.status)
+        record['total_flux'].append(solution.objective_value)
+
+        start = time.perf_counter()
+        fva = cobra.flux_analysis.flux_variability_analysis(lp_model, reactions, processes=1)
+        record['fva_s'] = min(record['fva_s'], time.perf_counter() - start)
+        record['fva'].append(fva[['minimum', 'maximum']].to_numpy().tolist())
+    return record
+
+def _solver_tuning_worker(model_key, descriptor, dataset, settings, fva_reactions, repeats, config, connection):
+    '''Times the solver settings on the prepared model and sends the record to the parent process'''
+    try:
+        model = load_prepared_model(model_key, descriptor, config)
+        if dataset is not None:
+            # uptakes as upper limits (fixed uptakes can be infeasible)
+            for rxn_id, bounds in dataset_patches(model, descriptor, dict(dataset, fixed_uptakes=False))[0].items():
+                model.reactions.get_by_id(rxn_id).bounds = bounds
+        connection.send(solver_timings(model, settings, fva_reactions, repeats))
+    except Exception as error:
+        connection.send({'error': f'{type(error).__name__}: {error}'})
+    connection.close()
+
+def _tuning_results_agree(values, reference, tolerance):
+    values = np.asarray(values, dtype=float)
+    return values.shape == reference.shape and bool(np.all(np.abs(values - reference) <= tolerance * np.maximum(1, np.abs(reference))))
+
+def tune_solver(model_key, descriptor, candidates, dataset=None, fva_reactions=100, repeats=3, tolerance=1e-4, timeout=300, config=None, verbose=False):
+    '''Times every candidate solver setting on the prepared model in its own process
+    Returns {'settings': fastest stable settings (None if no candidate is stable), 'candidates': [records]}'''
+    config = config if config is not None else load_config()
+    records = []
+    for candidate in candidates:
+        settings = dict(_default_solver_settings, **candidate)
+        if settings['interface'] != 'auto' and not solver_available(settings['interface']):
+            records.append({'settings': settings, 'error': 'not installed'})
+            continue
+        parent_connection, child_connection = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_solver_tuning_worker, args=(model_key, descriptor, dataset, settings, fva_reactions, repeats, config, child_connection), daemon=True)
+        process.start()
+        child_connection.close()
+        if parent_connection.poll(timeout):
+            try:
+                record = parent_connection.recv()
+            except EOFError:
+                process.join()
+                record = {'error': f'solver process crashed (exit code {process.exitcode})'}
+        else:
+            process.terminate()
+            record = {'error': f'timed out after {timeout} s'}
+        process.join()
+        parent_connection.close()
+        records.append(dict(record, settings=settings))
+        if verbose:
+            print(f'{model_key} {settings}: {record.get("error") or ", ".join(f"{stage} {record[stage]:.3f} s" for stage in ("fba_s", "pfba_s", "fva_s"))}')
+
+    # results of the candidates whose solves were all optimal, the median is the reference of the stability check
+    optimal = [record for record in records if 'error' not in record and all(status == 'optimal' for status in record['statuses'])]
+    references = {result: np.median([record[result] for record in optimal], axis=0) for result in ('growth', 'total_flux', 'fva')} if optimal else {}
+    for record in records:
+        record['stable'] = any(record is optimal_record for optimal_record in optimal) and all(_tuning_results_agree(record[result], reference, tolerance) for result, reference in references.items())
+        record['total_s'] = sum(record[stage] for stage in ('fba_s', 'pfba_s', 'fva_s')) if 'error' not in record else None
+        for result in ('growth', 'total_flux', 'fva'):
+            record.pop(result, None)
+    stable = [record for record in records if record['stable']]
+    best = min(stable, key=lambda record: record['total_s']) if stable else None
+    return {'settings': best['settings'] if best else None, 'candidates': records}
+
+def store_solver_tuning(tuning, path):
+    '''Stores the auto-tuning results ({model: tune_solver result}) as json file, results of other models in the file are kept'''
+    stored = dict(load_solver_tuning(path), **tuning)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_file = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_file, 'w') as file:
+        json.dump(stored, file, indent=1)
+    os.replace(tmp_file, path)
+    _solver_tunings[path] = stored
+
+# Flux variability analysis
+def find_cycle_reactions(model, reaction_list=None, zero_cutoff=None, workers=1):
+    '''Returns the ids of the internal reactions (of reaction_list) which can carry flux in a thermodynamically infeasible cycle'''
+    reaction_ids = [rxn.id for rxn in model.reactions] if reaction_list is None else [getattr(rxn, 'id', rxn) for rxn in reaction_list]
+    internal = [model.reactions.get_by_id(rxn_id) for rxn_id in reaction_ids if not model.reactions.get_by_id(rxn_id).boundary]
+    if not internal:
+        return []
+    with model:
+        for rxn in model.reactions:
+            rxn.bounds = (0, 0) if rxn.boundary else (min(rxn.lower_bound, 0), max(rxn.upper_bound, 0))
+        blocked = set(cobra.flux_analysis.find_blocked_reactions(model, reaction_list=internal, zero_cutoff=zero_cutoff, processes=workers))
+    return [rxn.id for rxn in internal if rxn.id not in blocked]
+
+_loopless_fva_model = None # FVA problem of a loopless FVA worker process
+
+def _loopless_fva_problem(model, fraction_of_optimum=1.0):
+    '''Returns a copy of the model with the objective fixed to fraction_of_optimum of its optimum and a zero objective'''
+    from optlang.symbolics import Zero # zero objective (optlang is loaded with cobra)
+    fva_model = model.copy()
+    value = fva_model.slim_optimize(error_value=None, message='There is no optimal solution for the chosen objective!')
+    if fva_model.solver.objective.direction == 'max':
+        fva_old_objective = fva_model.problem.Variable('fva_old_objective', lb=fraction_of_optimum * value)
+    else:
+        fva_old_objective = fva_model.problem.Variable('fva_old_objective', ub=fraction_of_optimum * value)
+    fva_old_objective_constraint = fva_model.problem.Constraint(fva_model.solver.objective.expression - fva_old_objective, lb=0, ub=0, name='fva_old_objective_constraint')
+    fva_model.add_cons_vars([fva_old_objective, fva_old_objective_constraint])
+    fva_model.objective = Zero
+    return fva_model
+
+def _loopless_fva_worker_init(fva_model):
+    global _loopless_fva_model
+    _loopless_fva_model = fva_model
+
+def _loopless_fva_step(task):
+    '''Minimizes or maximizes one reaction and removes the loops of the solution (loopless MILP if this fails)'''
+    rxn_id, sense = task
+    model = _loopless_fva_model
+    rxn = model.reactions.get_by_id(rxn_id)
+    model.solver.objective.direction = sense
+    model.solver.objective.set_linear_coefficients({rxn.forward_variable: 1, rxn.reverse_variable: -1})
+    model.slim_optimize()
+    try:
+        value = cobra.flux_analysis.loopless.loopless_fva_iter(model, rxn) if model.solver.status == 'optimal' else None
+    except (ValueError, cobra.exceptions.OptimizationError):
+        value = None
+    milp = value is None
+    if milp:
+        with model:
+            cobra.flux_analysis.loopless.add_loopless(model)
+            model.solver.objective.direction = sense
+            value = model.slim_optimize(error_value=np.nan)
+    model.solver.objective.set_linear_coefficients({rxn.forward_variable: 0, rxn.reverse_variable: 0})
+    return rxn_id, sense, value, milp
+
+def loopless_fva(model, reaction_list=None, fraction_of_optimum=1.0, workers=1, verbose=False):
+    '''Loopless FVA (like flux_variability_analysis(..., loopless=True)), only reactions in cycles are solved again'''
+    start = time.perf_counter()
+    fva_solution = cobra.flux_analysis.flux_variability_analysis(model, reaction_list=reaction_list, fraction_of_optimum=fraction_of_optimum, processes=workers)
+    # fixed reactions keep their (single) value in the loopless FVA
+    variable_reactions = fva_solution.index[(fva_solution.maximum - fva_solution.minimum).abs() > model.tolerance]
+    cycle_reactions = find_cycle_reactions(model, variable_reactions, workers=workers)
+
+    tasks = [(rxn_id, sense) for rxn_id in cycle_reactions for sense in ('min', 'max')]
+    milp_solves = 0
+    if tasks:
+        fva_model = _loopless_fva_problem(model, fraction_of_optimum)
+        if workers <= 1:
+            _loopless_fva_worker_init(fva_model)
+            results = list(map(_loopless_fva_step, tasks))
+        else:
+            with multiprocessing.Pool(processes=min(workers, len(tasks)), initializer=_loopless_fva_worker_init, initargs=(fva_model,)) as pool:
+                results = list(pool.imap_unordered(_loopless_fva_step, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+        for rxn_id, sense, value, milp in results:
+            fva_solution.at[rxn_id, 'minimum' if sense == 'min' else 'maximum'] = value
+            milp_solves += milp
+    if verbose:
+        print(f'loopless FVA of {len(fva_solution)} reactions ({len(cycle_reactions)} in internal cycles, {milp_solves} MILP solves) computed in {time.perf_counter() - start:.2f} s')
+    return fva_solution
+
+# Storing FVA results (content-addressed by model file, condition and FVA settings)
+def _fva_store_format():
+    '''Returns parquet if pandas can write parquet files (pyarrow or fastparquet), otherwise csv'''
+    for module in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(module)
+            return 'parquet'
+        except ImportError:
+            pass
+    return 'csv'
+
+def fva_store_key(model, reaction_list=None, loopless=False, fraction_of_optimum=1.0):
+    '''Returns the key of an FVA result (model state, loopless flag, solver, fraction_of_optimum and reaction list)'''
+    digest = _model_state_digest(model)
+    digest.update(f'{bool(loopless)}|{model.solver.interface.__name__}|{fraction_of_optimum!r}'.encode())
+    reaction_ids = 'all' if reaction_list is None else ','.join(sorted(getattr(rxn, 'id', rxn) for rxn in reaction_list))
+    digest.update(reaction_ids.encode())
+    return digest.hexdigest()
+
+def load_fva(key, store_dir):
+    '''Returns the stored FVA result (DataFrame with the columns minimum and maximum) of the key or None'''
+    for file_format in ('parquet', 'csv'):
+        path = os.path.join(store_dir, f'{key}.{file_format}')
+        if not os.path.isfile(path):
+            continue
+        try:
+            if file_format == 'parquet':
+                return pd.read_parquet(path)
+            return pd.read_csv(path, sep=_sep, index_col=0)
+        except Exception:
+            # unreadable file (e.g. parquet without pyarrow) => next format or recompute
+            continue
+    return None
+
+def store_fva(fva_solution, key, store_dir):
+    '''Stores the FVA result under its key (parquet if available, otherwise csv)'''
+    os.makedirs(store_dir, exist_ok=True)
+    file_format = _fva_store_format()
+    path = os.path.join(store_dir, f'{key}.{file_format}')
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    if file_format == 'parquet':
+        fva_solution.to_parquet(tmp_path)
+    else:
+        fva_solution.to_csv(tmp_path, sep=_sep)
+    os.replace(tmp_path, path)
 
+def cached_fva(model, reaction_list=None, loopless=False, fraction_of_optimum=1.0, workers=1, config=None, verbose=False):
+    '''Returns the FVA of the model from the FVA store (config: results/fva_store) or computes and stores it'''
+    config = config if config is not None else load_config()
+    store_dir = config['results'].get('fva_store', '')
+    key = fva_store_key(model, reaction_list, loopless, fraction_of_optimum) if store_dir != '' else ''
+    if store_dir != '':
+        fva_solution = load_fva(key, store_dir)
+        if fva_solution is not None:
+            if verbose:
+                print(f'FVA of {model.id} loaded from the FVA store ({key[:16]})')
+            return fva_solution
 
-def get_all_models():
-    """Returns a list of all models in use (also S. cerevisiae and E. coli in order to compare them)"""
-    config = load_config()
-    models = {
-        'yli647_corr': config['models']['yli647_corr'], 
-        'yli647_uncorr': config['models']['yli647_uncorr'], 
-        'iYali4_corr': config['models']['yli4_corr'], 
-        'iYali4_uncorr': config['models']['yli4_uncorr'], 
-        'iYli_2.0_corr': config['models']['yli2.0_corr'], 
-        #'iYli_2.0_uncorr': config['models']['yli2.0_uncorr'], 
-        'iMK735_corr': config['models']['yliMK735_corr'], 
-        'iMK735_uncorr': config['models']['yliMK735_uncorr'], 
-        'iNL895_corr': config['models']['yliNL895_corr'],
-        'iNL895_uncorr': config['models']['yliNL895_uncorr'],
-        'iYli21': config['models']['yli21'],
-        'iYL619_PCP': config['models']['iYL619_PCP'],
-        'PpaMBEL1254': config['models']['ppaMBEL1254'],
-        'iMT1026v3': config['models']['ppa1026v3'],
-        'iMT1026Chan2017': config['models']['ppa1026Chan'],
-        'iLC915': config['models']['ppaiLC915'],
-        'iAF1260': config['models']['ecoli'],
-        'iMM904': config['models']['scere'],
-    }
-    return models
-
-def get_loadable_models():
-    config = load_config()
-
-    loadable_models = {
-        'yli647_corr': config['models']['yli647_corr'],
-        'iYali4_corr': config['models']['yli4_corr'], 
-        'iYali4_uncorr': config['models']['yli4_uncorr'], 
-        'iYli_2.0_corr': config['models']['yli2.0_corr'], 
-        'iMK735_corr': config['models']['yliMK735_corr'], 
-        'iMK735_uncorr': config['models']['yliMK735_uncorr'], 
-        'iNL895_corr': config['models']['yliNL895_corr'],
-        'iNL895_uncorr': config['models']['yliNL895_uncorr'],
-        'iYli21': config['models']['yli21'],
-        'PpaMBEL1254': config['models']['ppaMBEL1254'],
-        'iMT1026v3': config['models']['ppa1026v3'],
-        'iLC915': config['models']['ppaiLC915'],
-    }
-    return loadable_models
-
-def get_models():
-    """Returns a list of the models from Yli and Ppa in use"""
-    config = load_config()
-    models = {
-        'yli647_corr': config['models']['yli647_corr'], 
-        'iYali4_corr': config['models']['yli4_corr'], 
-        'iYli_2.0_corr': config['models']['yli2.0_corr'], 
-        'iMK735_corr': config['models']['yliMK735_corr'], 
-        'iNL895_corr': config['models']['yliNL895_corr'],
-        'iYli21': config['models']['yli21'],
-        'iMT1026v3': config['models']['ppa1026v3'],
-        'iMT1026Chan2017': config['models']['ppa1026Chan'],
-        'iLC915': config['models']['ppaiLC915'],
-    }
-    return models
\ No newline at end of file
+    if loopless:
+        fva_solution = loopless_fva(model, reaction_list, fraction_of_optimum, workers, verbose)
+    else:
+        fva_solution = cobra.flux_analysis.flux_variability_analysis(model, reaction_list=reaction_list, fraction_of_optimum=fraction_of_optimum, processes=workers)
+    if store_dir != '':
+        store_fva(fva_solution, key, store_dir)
+    return fva_solution
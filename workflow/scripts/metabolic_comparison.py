@@ -13,6 +13,8 @@ config = hf.load_config()
 # parameters
 _verbose = config['general']['verbose']
 _loopless = config['general']['loopless']
+_full_fva = config['general']['full_fva']
+_fva_workers = config['fva']['workers']
 _condition = 'python_script_loopless_all_glycolysis_TCA'
 _snakemake = config['general']['snakemake']
 
@@ -35,10 +37,9 @@ def set_growth_condition(model, biomass_rxn, growth_condition, maintenance_rxn,
         # set maintenance
         model.reactions.get_by_id(maintenance_rxn).bounds = maintenance
 
-def get_reaction_fluxes(model, reactions, biomass_rxn, growth_condition, maintenance_rxn, maintenance, verbose=False):
-    """Computes FBA solution of a given growth condition and returns the fluxes of the reactions of interest"""
-    current_fluxes = {}
-
+def get_reaction_fluxes(model, biomass_rxn, growth_condition, maintenance_rxn, maintenance, condition=_condition, verbose=False):
+    """Computes the pFBA solution of a given growth condition and returns the fluxes of all reactions
+    as flux matrix (dataframe, index: condition, columns: reactions, see helperFunction.save_flux_matrix)"""
     # set growth condition
     set_growth_condition(model, biomass_rxn, growth_condition, maintenance_rxn, maintenance)
     # compute FBA solution
@@ -46,73 +47,43 @@ def get_reaction_fluxes(model, reactions, biomass_rxn, growth_condition, mainten
     pfba_solution = cobra.flux_analysis.pfba(model)
     if verbose:
         print(f'The objective value of the {model} is: {pfba_solution.fluxes[biomass_rxn]}')
-    # collect pathway fluxes
-    for ec_number, rxn_id in reactions.items():
-        if rxn_id == "-":
-            continue
-        current_fluxes[ec_number] = (pfba_solution.fluxes[rxn_id],rxn_id)
-    return current_fluxes
-
-def get_fva_intervals(model, reactions, biomass_rxn, growth_condition, maintenance_rxn, maintenance, loopless=False, fva_solution="",verbose=False):
-    """Computes FBA solution of a given growth condition and returns the fluxes of the reactions of interest"""
-    current_fva_interval = {}
-    
+    return pfba_solution.fluxes.astype(np.float64).to_frame(condition).T
+
+def get_fva_intervals(model, reactions, biomass_rxn, growth_condition, maintenance_rxn, maintenance, loopless=False, fva_solution="", verbose=False, full_fva=False, workers=1):
+    """Computes the FVA solution (dataframe with minimum and maximum, index: reaction ids) of a given growth condition
+    (the intervals of the reactions of interest are selected in get_fva_flux_table)
+    @params: full_fva: computes the FVA of every reaction of the model instead of only the mapped reactions (and the biomass reaction)
+    @params: workers: number of processes of the FVA (loopless: see helperFunction.loopless_fva)
+    FVA results are stored in and loaded from the FVA store (see helperFunction.cached_fva)"""
     # set growth condition
     set_growth_condition(model, biomass_rxn, growth_condition, maintenance_rxn, maintenance)
     
-    # compute FVA solution if fva_solution == {}
-    fva_solution = fva_solution if isinstance(fva_solution, pd.DataFrame) else cobra.flux_analysis.flux_variability_analysis(model, loopless=loopless)
+    # compute FVA solution if fva_solution == {} (only the mapped reactions are read back)
+    reaction_list = None if full_fva else list(dict.fromkeys([rxn_id for rxn_id in reactions.values() if rxn_id != "-"] + [biomass_rxn]))
+    if not isinstance(fva_solution, pd.DataFrame):
+        # identical model files, conditions and settings are loaded from the FVA store
+        fva_solution = hf.cached_fva(model, reaction_list, loopless, workers=workers, config=config, verbose=verbose)
     if verbose:
         print(f'The objective value of the {model} is: {fva_solution.loc[biomass_rxn]}')
-    
-    # collect pathway intervals
-    for ec_number, rxn_id in reactions.items():
-        if rxn_id == "-":
-            continue
-        current_fva_interval[ec_number] = (fva_solution.loc[rxn_id].minimum, fva_solution.loc[rxn_id].maximum)
-    return fva_solution, current_fva_interval
-
-def get_fva_flux_table(model_name, fluxes, fva_intervals, reaction_table):
-    """Returns a pandas dataframe with fluxes and their corresponding fva intervals."""
-    # fluxes to dataframe and key as column
-    flux_df = pd.DataFrame.from_dict(fluxes, orient='index', columns=['flux', 'reaction_id'])
-    # index to column with name EC
-    flux_df.reset_index(inplace=True)
-    flux_df.columns = ['EC', f'{model_name}_flux', f'{model_name}_reaction_id']
-
-    # fva_intervals to dataframe
-    fva_intervals = pd.DataFrame.from_dict(fva_intervals, orient='index', columns=['min', 'max'])
-    # index to column with name EC
-    fva_intervals.reset_index(inplace=True)
-    fva_intervals.columns = ['EC', f'{model_name}_min', f'{model_name}_max']
-
-    # left join flux_df to glycolysis table on EC
-    glycolysis_result = pd.merge(pd.merge(reaction_table, flux_df, on='EC', how='left'), fva_intervals, on='EC', how='left')
-    return glycolysis_result
+    return fva_solution
+
+def get_fva_flux_table(model_name, fluxes, fva_solution, reaction_table, reactions, condition=_condition):
+    """Returns the reaction table with the flux (row condition of the flux matrix), the reaction id and the FVA interval
+    of the mapped reaction ({EC: reaction id}) of every EC number, selected by reindex"""
+    reaction_table = reaction_table.copy()
+    rxn_ids = reaction_table['EC'].map(reactions).replace('-', np.nan)
+    fva_intervals = fva_solution.reindex(rxn_ids)
+    reaction_table[f'{model_name}_flux'] = fluxes.loc[condition].reindex(rxn_ids).to_numpy()
+    reaction_table[f'{model_name}_reaction_id'] = rxn_ids.to_numpy()
+    reaction_table[f'{model_name}_min'] = fva_intervals['minimum'].to_numpy()
+    reaction_table[f'{model_name}_max'] = fva_intervals['maximum'].to_numpy()
+    return reaction_table
 
 def prepare_iLC915(iLC915_model):
     """Prepares the iLC915 model for the comparison (no carbon source)"""
-    # prepare iLC915_model: needed because of internal cycles and active reactions
-    # lower and upper bounds of several reactions should be set to zero according to supplementary material of iMT1026
+    # prepare iLC915_model: needed because of internal cycles and active reactions (config: preparations/iLC915)
     print('Preparing iLC915 model for comparison...')
-    constraints_2_zero = ['r66','r910','r1104','r239','r111','r106','r490','r791','r243','r252','r253','r307','r308','r404','r405','r1320','r639','r640','r641','r642','r649','r650','r651','r652','r645','r646','r643','r644','r653','r654','r655','r656','r534'] 
-    for rxn_id in constraints_2_zero:
-        rxn = iLC915_model.reactions.get_by_id(rxn_id)
-        rxn.bounds = (0,0)
-    # constraint formulate uptake because of not meaningful results
-    formulate_uptake = iLC915_model.reactions.get_by_id('r1143')
-    formulate_uptake.bounds = (0,0)
-    # important carbon sources (biotin, CO2, urea)
-    important_carbon = ['r1132','r1137','r1177']
-
-    # all carbon containing exchange reactions
-    carbon_exchange_rxns = ['r1122', 'r1123', 'r1124', 'r1126', 'r1127', 'r1129', 'r1130', 'r1131', 'r1132', 'r1134', 'r1135', 'r1137', 'r1138', 'r1139', 'r1140', 'r1141', 'r1144', 'r1145', 'r1146', 'r1147', 'r1148', 'r1149', 'r1151', 'r1152', 'r1153', 'r1154', 'r1155', 'r1156', 'r1157', 'r1158', 'r1161', 'r1162', 'r1163', 'r1165', 'r1167', 'r1168', 'r1170', 'r1172', 'r1173', 'r1174', 'r1175', 'r1176', 'r1177', 'r1178']
-
-    # set all carbon exchange reactions to 0 except important ones
-    for rxn_id in carbon_exchange_rxns:
-        if rxn_id not in important_carbon:
-            rxn = iLC915_model.reactions.get_by_id(rxn_id)
-            rxn.bounds = (0,0)
+    hf.prepare_model(iLC915_model, {'preparation': 'iLC915', 'biomass': 'r1339'}, config)
 
     # check definition of important rxns 
     important_rxns = ['r1133', 'r1141', 'r1145', 'r1144', 'r1148', 'r1160', 'r1137', 'r1188']
@@ -123,29 +94,15 @@ def prepare_iLC915(iLC915_model):
             print(rxn.reactants, rxn.products, rxn.bounds)
             print(rxn_id, rxn.name, hf.formulaWithNames(rxn), 'rxn coefficient: ', rxn.get_coefficient(list(rxn.metabolites.keys())[0]))
 
-    # set objective and maintenance
-    biomass_rxn = 'r1339' # biomass
-    # set objective: 
-    iLC915_model.objective = 'r1339'
-
-    # set maintenance reaction
-    maintenance = 'r1188'
-    maintenance_rxn = iLC915_model.reactions.get_by_id(maintenance)
-    # maintenance_rxn.bounds = (_ppa_maintenance,_ppa_maintenance)
-    # maintenance_rxn.bounds = (1,1) # according to iLC915_model
-    maintenance_rxn.bounds = (1.2434,1.2434) # according to iLC915_model (1.2434 * 2.26 = 2.81)
-
-    try: 
-        iLC915_model.summary()
-    except:
+    # without carbon source the model is infeasible, with glucose it grows (statuses are cached, see hf.feasibility_status)
+    if hf.feasibility_status(iLC915_model, config=config) != 'optimal':
         print('iLC915 model: works as expected')
 
     gluc = iLC915_model.reactions.get_by_id('r1145')
     gluc.bounds = (-10,10)
-    try: 
-        iLC915_model.summary()
+    if hf.feasibility_status(iLC915_model, config=config) == 'optimal':
         print('iLC915 model: works as expected')
-    except:
+    else:
         print('iLC915 model: does not work as expected')
     return iLC915_model
 
@@ -154,23 +111,23 @@ def main():
 
     ## yli 
     ### load yali4 model
-    iYali4_model = cobra.io.read_sbml_model(config['models']['yli4_corr'])
+    iYali4_model = hf.load_model('yli4_corr', config)
     ### load yli21 model
-    iYli21_model = cobra.io.read_sbml_model(config['models']['yli21'])
+    iYli21_model = hf.load_model('yli21', config)
     ### load iYLI647 model (no EC numbers)
-    iYli647_model = cobra.io.read_sbml_model(config['models']['yli647_corr'])
+    iYli647_model = hf.load_model('yli647_corr', config)
     ### load yli20 model
-    iYli20_model = cobra.io.read_sbml_model(config['models']['yli2.0_corr'])
+    iYli20_model = hf.load_model('yli2.0_corr', config)
     ### load iNL895 model
-    iNL895_model = cobra.io.read_sbml_model(config['models']['yliNL895_corr'])
+    iNL895_model = hf.load_model('yliNL895_corr', config)
     ### load iMK735 model
-    iMK735_model = cobra.io.read_sbml_model(config['models']['yliMK735_corr'])
+    iMK735_model = hf.load_model('yliMK735_corr', config)
 
     ## ppa
     ### load iMT1026v3 model
-    iMT1026v3_model = cobra.io.read_sbml_model(config['models']['ppa1026v3'])
+    iMT1026v3_model = hf.load_model('ppa1026v3', config)
     ### load iLC915 model
-    iLC915_model = cobra.io.read_sbml_model(config['models']['ppaiLC915'])
+    iLC915_model = hf.load_model('ppaiLC915', config)
 
     # matching reactions
 
@@ -407,10 +364,11 @@ def main():
 
 
     # # fluxes and fva intervals
-    # current_fluxes = get_reaction_fluxes(iLC915_model, iLC915_glycolysis_without_branches, biomass_rxn, growth_condition, maintenance_rxn, _ppa_maintenance)
-    # iLC915_fva_solution, current_fva_intervals = get_fva_intervals(iLC915_model, iLC915_glycolysis_without_branches, biomass_rxn, growth_condition, maintenance_rxn, _ppa_maintenance, _loopless, "", _verbose)
+    # current_fluxes = get_reaction_fluxes(iLC915_model, biomass_rxn, growth_condition, maintenance_rxn, _ppa_maintenance)
+    # iLC915_fva_solution = get_fva_intervals(iLC915_model, iLC915_glycolysis_without_branches, biomass_rxn, growth_condition, maintenance_rxn, _ppa_maintenance, _loopless, "", _verbose, _full_fva, _fva_workers)
     # # get flux table
-    # reaction_table = get_fva_flux_table(model_name, current_fluxes, current_fva_intervals, reaction_table)
+    # reaction_table = get_fva_flux_table(model_name, current_fluxes, iLC915_fva_solution, reaction_table, iLC915_glycolysis_without_branches)
+    # hf.save_flux_matrix(current_fluxes, f"{config['results']['metabolic_fluxes']}/{_condition}_{model_name}_fluxes.npz")
     # # output
     # # reaction_table.to_csv(f"{config['results']['metabolic_fluxes']}/{_condition}_flux_fva.csv", sep=config['seperator'], index=False)
 
@@ -427,10 +385,11 @@ def main():
     }
 
     # fluxes and fva intervals
-    current_fluxes = get_reaction_fluxes(iMT1026v3_model, iMT1026v3_combined, biomass_rxn, growth_condition, maintenance_rxn, _ppa_maintenance)
-    iMT1026v3_fva_solution, current_fva_intervals = get_fva_intervals(iMT1026v3_model, iMT1026v3_combined, biomass_rxn, growth_condition, maintenance_rxn, _ppa_maintenance, _loopless, "", _verbose)
+    current_fluxes = get_reaction_fluxes(iMT1026v3_model, biomass_rxn, growth_condition, maintenance_rxn, _ppa_maintenance)
+    iMT1026v3_fva_solution = get_fva_intervals(iMT1026v3_model, iMT1026v3_combined, biomass_rxn, growth_condition, maintenance_rxn, _ppa_maintenance, _loopless, "", _verbose, _full_fva, _fva_workers)
     # get flux table
-    reaction_table = get_fva_flux_table(model_name, current_fluxes, current_fva_intervals, reaction_table)
+    reaction_table = get_fva_flux_table(model_name, current_fluxes, iMT1026v3_fva_solution, reaction_table, iMT1026v3_combined)
+    hf.save_flux_matrix(current_fluxes, f"{config['results']['metabolic_fluxes']}/{_condition}_{model_name}_fluxes.npz")
     # output
     # reaction_table.to_csv(f"{config['results']['metabolic_fluxes']}/{_condition}_flux_fva.csv", sep=config['seperator'], index=False)
     # reaction_table.to_csv(config['results']['metabolic_comparison_condition'], sep=config['seperator'], index=False)
@@ -452,10 +411,11 @@ def main():
     # For glycolysis and citrate cycle
     iYli647_glycolysis_and_citrate_cycle = {**iYli647_glycolysis_without_branches, **iYli647_citrate_cycle}
 
-    current_fluxes = get_reaction_fluxes(iYli647_model, iYli647_glycolysis_and_citrate_cycle, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance)
-    iYli647_fva_solution, current_fva_intervals = get_fva_intervals(iYli647_model, iYli647_glycolysis_and_citrate_cycle, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance, _loopless, "", _verbose)
+    current_fluxes = get_reaction_fluxes(iYli647_model, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance)
+    iYli647_fva_solution = get_fva_intervals(iYli647_model, iYli647_glycolysis_and_citrate_cycle, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance, _loopless, "", _verbose, _full_fva, _fva_workers)
     # add both to the csv table
-    reaction_table = get_fva_flux_table(model_name, current_fluxes, current_fva_intervals, reaction_table)
+    reaction_table = get_fva_flux_table(model_name, current_fluxes, iYli647_fva_solution, reaction_table, iYli647_glycolysis_and_citrate_cycle)
+    hf.save_flux_matrix(current_fluxes, f"{config['results']['metabolic_fluxes']}/{_condition}_{model_name}_fluxes.npz")
     # reaction_table.to_csv(f"{config['results']['metabolic_fluxes']}/{_condition}_flux_fva.csv", sep=config['seperator'], index=False)
     # reaction_table.to_csv(config['results']['metabolic_comparison_condition'], sep=config['seperator'], index=False)
 
@@ -471,10 +431,11 @@ def main():
         '1808': 0, # glycerol
     }
 
-    current_fluxes = get_reaction_fluxes(iYali4_model, yali4_combined, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance)
-    iYali4_fva_solution, current_fva_intervals = get_fva_intervals(iYali4_model, yali4_combined, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance, _loopless, "", _verbose)
+    current_fluxes = get_reaction_fluxes(iYali4_model, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance)
+    iYali4_fva_solution = get_fva_intervals(iYali4_model, yali4_combined, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance, _loopless, "", _verbose, _full_fva, _fva_workers)
     # add both to the csv table
-    reaction_table = get_fva_flux_table(model_name, current_fluxes, current_fva_intervals, reaction_table)
+    reaction_table = get_fva_flux_table(model_name, current_fluxes, iYali4_fva_solution, reaction_table, yali4_combined)
+    hf.save_flux_matrix(current_fluxes, f"{config['results']['metabolic_fluxes']}/{_condition}_{model_name}_fluxes.npz")
     # reaction_table.to_csv(f"{config['results']['metabolic_fluxes']}/{_condition}_flux_fva.csv", sep=config['seperator'], index=False)
     # reaction_table.to_csv(config['results']['metabolic_comparison_condition'], sep=config['seperator'], index=False)
 
@@ -489,14 +450,18 @@ def main():
         'R1065': 0, # fructose
         'R1141': 0, # glycerol
     }
-    current_fluxes = get_reaction_fluxes(iYli21_model, iYli21_combined, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance)
-    iYli21_fva_solution, current_fva_intervals = get_fva_intervals(iYli21_model, iYli21_combined, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance, _loopless, "", _verbose)
+    current_fluxes = get_reaction_fluxes(iYli21_model, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance)
+    iYli21_fva_solution = get_fva_intervals(iYli21_model, iYli21_combined, biomass_rxn, growth_condition, maintenance_rxn, _yli_maintenance, _loopless, "", _verbose, _full_fva, _fva_workers)
     # add both to the csv table
-    reaction_table = get_fva_flux_table(model_name, current_fluxes, current_fva_intervals, reaction_table)
+    reaction_table = get_fva_flux_table(model_name, current_fluxes, iYli21_fva_solution, reaction_table, iYli21_combined)
+    hf.save_flux_matrix(current_fluxes, f"{config['results']['metabolic_fluxes']}/{_condition}_{model_name}_fluxes.npz")
     # reaction_table.to_csv(f"{config['results']['metabolic_fluxes']}/{_condition}_flux_fva.csv", sep=config['seperator'], index=False)
     reaction_table.to_csv(config['results']['metabolic_comparison_condition'], sep=config['seperator'], index=False)
 
     print('finished metabolic analysis and stored the Flux Variability Analysis (FVA) results in a csv file.')
+    if _verbose:
+        # load times of the models (cache hits vs. cache misses)
+        hf.model_cache_report()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,128 @@
+# config and model registry: config file access and the model paths (only os and yaml, the Snakefile imports this module
+# at DAG construction, analysis and plotting functions are in helperFunction which re-exports these functions)
+# the config is parsed once per process and the model paths are resolved independent of the working directory
+import os
+from typing import NamedTuple, Optional, Tuple
+
+import yaml # config file parsing
+
+_configs = {} # parsed config files of this process by absolute path (see load_config)
+_registries = [] # model registries of the loaded configs (see get_registry)
+_default_config = None # first config loaded by this process (default of get_registry)
+_workflow_config_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config')
+
+
+def config_path(config_name='model_config', config_dir='../config'):
+    '''Returns the absolute path of the config file (config_dir relative to the working directory)'''
+    return os.path.abspath(os.path.join(config_dir, f'{config_name}.yaml'))
+
+def load_config(config_name='model_config', config_dir='../config'):
+    '''Returns the config, every file is parsed only once per process (all calls share the returned dict, do not change it)'''
+    path = config_path(config_name, config_dir)
+    global _default_config
+    if path not in _configs:
+        # load config
+        with open(path, 'r') as file:
+            _configs[path] = yaml.safe_load(file)
+    if _default_config is None:
+        _default_config = _configs[path]
+    return _configs[path]
+
+def resolve_path(path, config_file):
+    '''Returns the absolute path of a path of the config file (relative paths are relative to the directory of the config file)'''
+    return os.path.normpath(os.path.join(os.path.dirname(config_file), os.path.expanduser(path)))
+
+
+class ModelDescriptor(NamedTuple):
+    '''Model of the config (models and model_registry)'''
+    key: str # config key (e.g. 'yli21')
+    name: str # model name (e.g. 'iYli21', the config key if the model is not in the model registry)
+    path: Optional[str] # absolute path of the SBML file, None if the model is not available as SBML file (e.g. 'in excel format')
+    organism: Optional[str] = None
+    groups: Tuple[str, ...] = () # 'all' (get_all_models), 'loadable' (get_loadable_models), 'used' (get_models)
+    biomass: Optional[str] = None # key reaction ids (None if not given)
+    maintenance: Optional[str] = None
+    glucose: Optional[str] = None # exchange reaction
+    oxygen: Optional[str] = None # exchange reaction
+
+class ModelRegistry:
+    '''Model descriptors of all models of the config (see ModelDescriptor), looked up by config key or model name'''
+
+    def __init__(self, config, config_file):
+        self.config = config
+        registry = config.get('model_registry') or {}
+        # models of the model registry first (order of the model groups)
+        keys = list(registry) + [key for key in config['models'] if key not in registry]
+        self.descriptors = {}
+        for key in keys:
+            entry = dict(registry.get(key) or {})
+            path = config['models'][key]
+            self.descriptors[key] = ModelDescriptor(key=key, name=entry.pop('name', key), groups=tuple(entry.pop('groups', ())),
+                                                    path=resolve_path(path, config_file) if path.endswith('.xml') else None, **entry)
+        self._keys = {descriptor.name: key for key, descriptor in self.descriptors.items()}
+        self._paths = {descriptor.path: key for key, descriptor in self.descriptors.items() if descriptor.path is not None}
+
+    def __contains__(self, key):
+        return key in self.descriptors or key in self._keys
+
+    def descriptor(self, key):
+        '''Returns the model descriptor of a config key (e.g. 'yli21') or a model name (e.g. 'iYli21')'''
+        if key in self.descriptors:
+            return self.descriptors[key]
+        if key in self._keys:
+            return self.descriptors[self._keys[key]]
+        raise KeyError(f'{key} is neither a model key nor a model name of the config file.')
+
+    def key(self, key):
+        '''Returns the config key of a config key, a model name or a model path (the given key if it is none of them)'''
+        if key in self:
+            return self.descriptor(key).key
+        return self._paths.get(os.path.abspath(key), key)
+
+    def models(self, group='all'):
+        '''Returns the paths of the models of a group ({model name: path})'''
+        return {descriptor.name: descriptor.path for descriptor in self.descriptors.values() if group in descriptor.groups}
+
+def get_registry(config=None):
+    '''Returns the model registry of a config (default: the first loaded config), built only once per config'''
+    config = config if config is not None else (_default_config if _default_config is not None else load_config())
+    for registry in _registries:
+        if registry.config is config:
+            return registry
+    # config file of the relative paths (configs which are not loaded by load_config: workflow/config)
+    config_file = next((path for path, loaded in _configs.items() if loaded is config), config_path(config_dir=_workflow_config_dir))
+    _registries.append(ModelRegistry(config, config_file))
+    return _registries[-1]
+
+
+def get_all_models(config=None):
+    """Returns a list of all models in use (also S. cerevisiae and E. coli in order to compare them)"""
+    return get_registry(config).models('all')
+
+def get_loadable_models(config=None):
+    return get_registry(config).models('loadable')
+
+def get_models(config=None):
+    """Returns a list of the models from Yli and Ppa in use"""
+    return get_registry(config).models('used')
+
+def get_model_path(key, config=None):
+    '''Returns the absolute model path for a config key (e.g. 'yli21'), a model name of get_all_models (e.g. 'iYli21') or a path'''
+    registry = get_registry(config)
+    if key in registry and registry.descriptor(key).path is not None:
+        return registry.descriptor(key).path
+    if os.path.isfile(key):
+        return key
+    raise KeyError(f'{key} is neither a model in the config file nor an existing model file.')
+
+def get_model_key(key, config=None):
+    '''Returns the config key (e.g. 'yli21') of a config key, a model name (e.g. 'iYli21') or a model path'''
+    return get_registry(config).key(key)
+
+def phpp_grid_name(phpp_config):
+    '''Returns the name of a PhPP grid (part of the output file name), changing a grid parameter changes the name'''
+    n = phpp_config['number_computations']
+    name = f"{n}x{n}_glu_{phpp_config['min_glu']}-{phpp_config['max_glu']}_oxy_{phpp_config['min_oxy']}-{phpp_config['max_oxy']}_{phpp_config['mode']}"
+    if phpp_config['adaptive']:
+        name += f"_adaptive_{phpp_config['initial_step']}"
+    return name
@@ -0,0 +1,48 @@
+# computes the phenotype phase plane (glucose vs. oxygen uptake) of one model described in the config (experiments/PhPP/models)
+# imports
+import numpy as np
+import sys # append path
+
+sys.path.append('../scripts/')
+import helperFunction as hf
+
+config = hf.load_config()
+
+# values: 
+_verbose = config['general']['verbose']
+_snakemake = config['general']['snakemake']
+_phpp = config['experiments']['PhPP']
+_model_name = 'ppaiLC915' # key of experiments/PhPP/models (snakemake: wildcard model)
+_workers = 8
+if _snakemake:
+    _model_name = snakemake.wildcards.model
+    _workers = snakemake.threads
+
+glucose_range = np.linspace(_phpp['min_glu'], _phpp['max_glu'], _phpp['number_computations'])
+oxygen_range = np.linspace(_phpp['min_oxy'], _phpp['max_oxy'], _phpp['number_computations'])
+
+
+def main():
+    descriptor = _phpp['models'][_model_name]
+    print(f'computing PhPP of {_model_name} ...')
+    # every worker loads the prepared model from the model cache (see helperFunction.load_prepared_model)
+    engine_kwargs = dict(workers=_workers, verbose=_verbose, mode=_phpp['mode'], x_sign=descriptor.get('glucose_sign', -1), prepare=descriptor, config=config)
+    points = None
+    if _phpp['adaptive']:
+        # coarse grid, only cells at phase boundaries are refined (solved points are stored as point cloud)
+        growth_rates, points = hf.adaptive_phenotype_phase_plane(_model_name, descriptor['glucose'], descriptor['oxygen'], descriptor['biomass'], glucose_range, oxygen_range, initial_step=_phpp['initial_step'], **engine_kwargs)
+    else:
+        growth_rates, _ = hf.phenotype_phase_plane(_model_name, descriptor['glucose'], descriptor['oxygen'], descriptor['biomass'], glucose_range, oxygen_range, **engine_kwargs)
+    print(f'computing for {_model_name} model finished')
+
+    # store data
+    outfile = f'../results/PhPP/{hf.phpp_grid_name(_phpp)}_{_model_name}_growth_rates.npy'
+    if _snakemake:
+        outfile = snakemake.output[0]
+    hf.save_phpp(outfile, growth_rates, points)
+    if _verbose:
+        print(growth_rates)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,6 @@
 # imports
 import cobra
 import yaml
-from cobra.flux_analysis import pfba
 import logging # remove the warnings while loading model => faster
 
 import sys # append path
@@ -44,8 +43,9 @@ _condition_names = ['normoxic', 'O2-limited', 'hypoxic']
 
 
 print('iLC915 model: ')
-# load iLC915
-iLC915_model = cobra.io.read_sbml_model(config['models']['ppaiLC915'])
+# load iLC915 prepared with the preparation profile iLC915 (config: preparations): internal cycles, formate uptake,
+# carbon exchanges except biotin, CO2 and urea closed and maintenance set (ready-to-solve snapshot in the model cache)
+iLC915_model = hf.load_prepared_model('ppaiLC915', {'preparation': 'iLC915'}, config)
 # all relevant reactions:
 iLC915_biomass_reaction = 'r1133' # biomass
 iLC915_glu_ex_rxn = 'r1145' # glucose uptake
@@ -56,26 +56,6 @@ iLC915_arabitol_ex_rxn = 'r1128' # Arabitol/arabinitol
 iLC915_ethanol_ex_rxn = 'r1141' # ethanol
 iLC915_maintenance = 'r1188' # maintenance 2.9 in iMT1026v3 (0 in iLC915)
 
-# prepare iLC915: needed because of internal cycles and active reactions
-# lower and upper bounds of several reactions should be set to zero according to supplementary material of 
-constraints_2_zero = ['r66','r910','r1104','r239','r111','r106','r490','r791','r243','r252','r253','r307','r308','r404','r405','r1320','r639','r640','r641','r642','r649','r650','r651','r652','r645','r646','r643','r644','r653','r654','r655','r656','r534'] 
-for rxn_id in constraints_2_zero:
-    rxn = iLC915_model.reactions.get_by_id(rxn_id)
-    rxn.bounds = (0,0)
-# constraint formulate uptake because of not meaningful results
-formulate_uptake = iLC915_model.reactions.get_by_id('r1143')
-formulate_uptake.bounds = (0,0)
-# important carbon sources (biotin, CO2, urea)
-important_carbon = ['r1132','r1137','r1177']
-
-# all carbon containing exchange reactions
-carbon_exchange_rxns = ['r1122', 'r1123', 'r1124', 'r1126', 'r1127', 'r1129', 'r1130', 'r1131', 'r1132', 'r1134', 'r1135', 'r1137', 'r1138', 'r1139', 'r1140', 'r1141', 'r1144', 'r1145', 'r1146', 'r1147', 'r1148', 'r1149', 'r1151', 'r1152', 'r1153', 'r1154', 'r1155', 'r1156', 'r1157', 'r1158', 'r1161', 'r1162', 'r1163', 'r1165', 'r1167', 'r1168', 'r1170', 'r1172', 'r1173', 'r1174', 'r1175', 'r1176', 'r1177', 'r1178']
-
-# set all carbon exchange reactions to 0 except important ones
-for rxn_id in carbon_exchange_rxns:
-    if rxn_id not in important_carbon:
-        rxn = iLC915_model.reactions.get_by_id(rxn_id)
-        rxn.bounds = (0,0)
 
 # check definition of important rxns 
 important_rxns = ['r1133', 'r1141', 'r1145', 'r1144', 'r1148', 'r1160', 'r1137', 'r1188']
@@ -108,43 +88,39 @@ iLC915_simulation_growth = []
 iLC915_simulation_co2_prod = []
 
 if (not _use_precomputed):
-    with iLC915_model as model:
-        for exp_idx in range(experiment_number):
-            # set bounds for glucose and oxygen uptake
-            glu_rxn = model.reactions.get_by_id(glu_ex_rxn) 
-            glu_rxn.bounds = (glucose_uptake[exp_idx], glucose_uptake[exp_idx]) # rxn is defined as: "--> glucose"
-            
-            o2_rxn = model.reactions.get_by_id(o2_ex_rxn)
-            o2_rxn.bounds = (oxygen_uptake[exp_idx], oxygen_uptake[exp_idx]) # rxn is defined as: "--> oxygen"
-
-            # set maintenance
-            maintenance_rxn = model.reactions.get_by_id(maintenance)
-            # maintenance_rxn.bounds = (_ppa_maintenance,_ppa_maintenance)
-            # maintenance_rxn.bounds = (1,1) # according to iLC915
-            maintenance_rxn.bounds = (1.2434,1.2434) # according to iLC915 (1.2434 * 2.26 = 2.81)
-            # maintenance_rxn.bounds = (0,0)
-
-            # set ethanol production
-            ethanol_rxn = model.reactions.get_by_id(ethanol_ex_rxn)
-            if (ppa_ethanol_prod[exp_idx] == 1000): # reaction is defined as "ethanol -->"
-                ethanol_rxn.bounds = (0,1000)
-            else:
-                ethanol_rxn.bounds = (ppa_ethanol_prod[exp_idx], ppa_ethanol_prod[exp_idx])
-            
-
-            # # set optional co2 uptake according to experimental data
-            # co2_rxn = model.reactions.get_by_id(co2_ex_rxn)
-            # co2_rxn.bounds = (ppa_co2_prod[exp_idx], ppa_co2_prod[exp_idx])
-
-            # get solution
-            solution = pfba(model)
-            print(f'Growth rate on {glucose_uptake[exp_idx]} mmol/h glucose: {round(solution.fluxes[biomass_reaction],4)}')
-            print(f'CO2 production on {glucose_uptake[exp_idx]} mmol/h glucose: {round(solution.fluxes[co2_ex_rxn],4)}')
-
-            # store growth
-            iLC915_simulation_growth.append(round(solution.fluxes[biomass_reaction],4))
-            # store co2 production
-            iLC915_simulation_co2_prod.append(round(solution.fluxes[co2_ex_rxn],4))
+    # bound patch of every growth condition, solved on one pFBA problem (see helperFunction.BatchPFBA)
+    patches = []
+    for exp_idx in range(experiment_number):
+        # set bounds for glucose and oxygen uptake
+        patch = {glu_ex_rxn: (glucose_uptake[exp_idx], glucose_uptake[exp_idx]), # rxn is defined as: "--> glucose"
+                 o2_ex_rxn: (oxygen_uptake[exp_idx], oxygen_uptake[exp_idx])} # rxn is defined as: "--> oxygen"
+
+        # set maintenance
+        # patch[maintenance] = (_ppa_maintenance,_ppa_maintenance)
+        # patch[maintenance] = (1,1) # according to iLC915
+        patch[maintenance] = (1.2434,1.2434) # according to iLC915 (1.2434 * 2.26 = 2.81)
+        # patch[maintenance] = (0,0)
+
+        # set ethanol production
+        if (ppa_ethanol_prod[exp_idx] == 1000): # reaction is defined as "ethanol -->"
+            patch[ethanol_ex_rxn] = (0,1000)
+        else:
+            patch[ethanol_ex_rxn] = (ppa_ethanol_prod[exp_idx], ppa_ethanol_prod[exp_idx])
+
+        # # set optional co2 uptake according to experimental data
+        # patch[co2_ex_rxn] = (ppa_co2_prod[exp_idx], ppa_co2_prod[exp_idx])
+        patches.append(patch)
+
+    # get solutions
+    fluxes = hf.BatchPFBA(iLC915_model, biomass_reaction).solve(patches, [biomass_reaction, co2_ex_rxn])
+    for exp_idx in range(experiment_number):
+        print(f'Growth rate on {glucose_uptake[exp_idx]} mmol/h glucose: {round(fluxes[biomass_reaction][exp_idx],4)}')
+        print(f'CO2 production on {glucose_uptake[exp_idx]} mmol/h glucose: {round(fluxes[co2_ex_rxn][exp_idx],4)}')
+
+        # store growth
+        iLC915_simulation_growth.append(round(fluxes[biomass_reaction][exp_idx],4))
+        # store co2 production
+        iLC915_simulation_co2_prod.append(round(fluxes[co2_ex_rxn][exp_idx],4))
 
     # add results to value dicts
     _growth_conditions[model_name] = iLC915_simulation_growth
@@ -158,7 +134,7 @@ print('iMT1026v3 model: ')
 
 # load model + set reactions
 logging.getLogger("cobra").setLevel(logging.ERROR)
-iMT1026v3_model = cobra.io.read_sbml_model(config['models']['ppa1026v3'])
+iMT1026v3_model = hf.load_model('ppa1026v3', config)
 
 # show interesting reactions
 model_name = 'iMT1026v3'
@@ -185,12 +161,11 @@ if _verbose:
 glyc_rxn = iMT1026v3_model.reactions.get_by_id('Ex_glyc')
 glyc_rxn.bounds = (0, 1000)
 
-try:
-    iMT1026v3_model.summary() # not feasible => all good
-    # raise error
-    raise ValueError('Model behaves not as expected')
-except:
+# not feasible => all good (status only, cached per model state, see hf.feasibility_status)
+if hf.feasibility_status(iMT1026v3_model, config=config) != 'optimal':
     print('Model behaves as expected')
+else:
+    print('Model behaves not as expected')
 
 # iMT1026v3: iterate over growth condition according to experimental data and store resulting growth rate
 # set objective function
@@ -201,42 +176,37 @@ iMT1026v3_simulation_growth = []
 # with CO2 constraint: 0.087; without CO2 constraint: 0.0898
 iMT1026v3_simulation_co2_prod = []
 if (not _use_precomputed):
-    with iMT1026v3_model as model:
-        for exp_idx in range(experiment_number):
-            # set bounds for glucose and oxygen uptake
-            glu_rxn = model.reactions.get_by_id(glu_ex_rxn) 
-            glu_rxn.bounds = (-glucose_uptake[exp_idx], -glucose_uptake[exp_idx]) # rxn is defined as: "--> glucose"
-            
-            o2_rxn = model.reactions.get_by_id(o2_ex_rxn)
-            o2_rxn.bounds = (-oxygen_uptake[exp_idx], -oxygen_uptake[exp_idx]) # rxn is defined as: "--> oxygen"
-
-            # set maintenance
-            maintenance_rxn = model.reactions.get_by_id(maintenance)
-            maintenance_rxn.bounds = (_ppa_maintenance,_ppa_maintenance)
-            # maintenance_rxn.bounds = (0,0)
-            # maintenance_rxn.bounds = (2.26,2.26)
-
-            # set ethanol production
-            ethanol_rxn = model.reactions.get_by_id(ethanol_ex_rxn)
-            if (ppa_ethanol_prod[exp_idx] == 1000): # reaction is defined as "ethanol -->"
-                ethanol_rxn.bounds = (0,1000)
-            else:
-                ethanol_rxn.bounds = (-ppa_ethanol_prod[exp_idx], -ppa_ethanol_prod[exp_idx])
-            
-
-            # # set optional co2 uptake according to experimental data
-            # co2_rxn = model.reactions.get_by_id(co2_ex_rxn)
-            # co2_rxn.bounds = (ppa_co2_prod[exp_idx], ppa_co2_prod[exp_idx])
-
-            # get solution
-            solution = pfba(model)
-            print(f'Growth rate on {glucose_uptake[exp_idx]} mmol/h glucose: {round(solution.fluxes[biomass_reaction],4)}')
-            print(f'CO2 production on {glucose_uptake[exp_idx]} mmol/h glucose: {round(solution.fluxes[co2_ex_rxn],4)}')
-
-            # store growth
-            iMT1026v3_simulation_growth.append(round(solution.fluxes[biomass_reaction],4))
-            # store co2 production
-            iMT1026v3_simulation_co2_prod.append(round(solution.fluxes[co2_ex_rxn],4))
+    # bound patch of every growth condition, solved on one pFBA problem (see helperFunction.BatchPFBA)
+    patches = []
+    for exp_idx in range(experiment_number):
+        # set bounds for glucose and oxygen uptake
+        patch = {glu_ex_rxn: (-glucose_uptake[exp_idx], -glucose_uptake[exp_idx]), # rxn is defined as: "--> glucose"
+                 o2_ex_rxn: (-oxygen_uptake[exp_idx], -oxygen_uptake[exp_idx])} # rxn is defined as: "--> oxygen"
+
+        # set maintenance
+        patch[maintenance] = (_ppa_maintenance,_ppa_maintenance)
+        # patch[maintenance] = (0,0)
+
+        # set ethanol production
+        if (ppa_ethanol_prod[exp_idx] == 1000): # reaction is defined as "ethanol -->"
+            patch[ethanol_ex_rxn] = (0,1000)
+        else:
+            patch[ethanol_ex_rxn] = (-ppa_ethanol_prod[exp_idx], -ppa_ethanol_prod[exp_idx])
+
+        # # set optional co2 uptake according to experimental data
+        # patch[co2_ex_rxn] = (ppa_co2_prod[exp_idx], ppa_co2_prod[exp_idx])
+        patches.append(patch)
+
+    # get solutions
+    fluxes = hf.BatchPFBA(iMT1026v3_model, biomass_reaction).solve(patches, [biomass_reaction, co2_ex_rxn])
+    for exp_idx in range(experiment_number):
+        print(f'Growth rate on {glucose_uptake[exp_idx]} mmol/h glucose: {round(fluxes[biomass_reaction][exp_idx],4)}')
+        print(f'CO2 production on {glucose_uptake[exp_idx]} mmol/h glucose: {round(fluxes[co2_ex_rxn][exp_idx],4)}')
+
+        # store growth
+        iMT1026v3_simulation_growth.append(round(fluxes[biomass_reaction][exp_idx],4))
+        # store co2 production
+        iMT1026v3_simulation_co2_prod.append(round(fluxes[co2_ex_rxn][exp_idx],4))
 
     # add results to value dicts
     _growth_conditions[model_name] = iMT1026v3_simulation_growth
@@ -248,7 +218,7 @@ if not _without_iMT1026v1:
 
     logging.getLogger("cobra").setLevel(logging.ERROR)
 
-    iMT1026v1_model = cobra.io.read_sbml_model(config['models']['ppa1026v1'])
+    iMT1026v1_model = hf.load_model('ppa1026v1', config)
 
     # reactions
     model_name = 'iMT1026v1'
@@ -280,41 +250,37 @@ if not _without_iMT1026v1:
         # with CO2 constraint: 0.087; without CO2 constraint: 0.0898
         iMT1026v1_simulation_co2_prod = []
 
-        with iMT1026v1_model as model:
-            for exp_idx in range(experiment_number):
-                # set bounds for glucose and oxygen uptake
-                glu_rxn = model.reactions.get_by_id(glu_ex_rxn) 
-                glu_rxn.bounds = (-glucose_uptake[exp_idx], -glucose_uptake[exp_idx]) # rxn is defined as: "--> glucose"
-                
-                o2_rxn = model.reactions.get_by_id(o2_ex_rxn)
-                o2_rxn.bounds = (-oxygen_uptake[exp_idx], -oxygen_uptake[exp_idx]) # rxn is defined as: "--> oxygen"
-
-                # set maintenance
-                maintenance_rxn = model.reactions.get_by_id(maintenance)
-                maintenance_rxn.bounds = (_ppa_maintenance,_ppa_maintenance)
-                # maintenance_rxn.bounds = (0,0)
-
-                # set ethanol production
-                ethanol_rxn = model.reactions.get_by_id(ethanol_ex_rxn)
-                if (ppa_ethanol_prod[exp_idx] == 1000): # reaction is defined as "ethanol -->"
-                    ethanol_rxn.bounds = (0,1000)
-                else:
-                    ethanol_rxn.bounds = (-ppa_ethanol_prod[exp_idx], -ppa_ethanol_prod[exp_idx])
-                
-
-                # # set optional co2 uptake according to experimental data
-                # co2_rxn = model.reactions.get_by_id(co2_ex_rxn)
-                # co2_rxn.bounds = (ppa_co2_prod[exp_idx], ppa_co2_prod[exp_idx])
-
-                # get solution
-                solution = pfba(model)
-                print(f'Growth rate on {glucose_uptake[exp_idx]} mmol/h glucose: {round(solution.fluxes[biomass_reaction],4)}')
-                print(f'CO2 production on {glucose_uptake[exp_idx]} mmol/h glucose: {round(solution.fluxes[co2_ex_rxn],4)}')
-
-                # store growth
-                iMT1026v1_simulation_growth.append(round(solution.fluxes[biomass_reaction],4))
-                # store co2 production
-                iMT1026v1_simulation_co2_prod.append(round(solution.fluxes[co2_ex_rxn],4))
+        # bound patch of every growth condition, solved on one pFBA problem (see helperFunction.BatchPFBA)
+        patches = []
+        for exp_idx in range(experiment_number):
+            # set bounds for glucose and oxygen uptake
+            patch = {glu_ex_rxn: (-glucose_uptake[exp_idx], -glucose_uptake[exp_idx]), # rxn is defined as: "--> glucose"
+                     o2_ex_rxn: (-oxygen_uptake[exp_idx], -oxygen_uptake[exp_idx])} # rxn is defined as: "--> oxygen"
+
+            # set maintenance
+            patch[maintenance] = (_ppa_maintenance,_ppa_maintenance)
+            # patch[maintenance] = (0,0)
+
+            # set ethanol production
+            if (ppa_ethanol_prod[exp_idx] == 1000): # reaction is defined as "ethanol -->"
+                patch[ethanol_ex_rxn] = (0,1000)
+            else:
+                patch[ethanol_ex_rxn] = (-ppa_ethanol_prod[exp_idx], -ppa_ethanol_prod[exp_idx])
+
+            # # set optional co2 uptake according to experimental data
+            # patch[co2_ex_rxn] = (ppa_co2_prod[exp_idx], ppa_co2_prod[exp_idx])
+            patches.append(patch)
+
+        # get solutions
+        fluxes = hf.BatchPFBA(iMT1026v1_model, biomass_reaction).solve(patches, [biomass_reaction, co2_ex_rxn])
+        for exp_idx in range(experiment_number):
+            print(f'Growth rate on {glucose_uptake[exp_idx]} mmol/h glucose: {round(fluxes[biomass_reaction][exp_idx],4)}')
+            print(f'CO2 production on {glucose_uptake[exp_idx]} mmol/h glucose: {round(fluxes[co2_ex_rxn][exp_idx],4)}')
+
+            # store growth
+            iMT1026v1_simulation_growth.append(round(fluxes[biomass_reaction][exp_idx],4))
+            # store co2 production
+            iMT1026v1_simulation_co2_prod.append(round(fluxes[co2_ex_rxn][exp_idx],4))
 
         # add results to value dicts
         _growth_conditions[model_name] = iMT1026v1_simulation_growth
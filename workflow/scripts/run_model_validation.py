@@ -1,32 +1,24 @@
 #  uses validation function from cobra and stores the results in a dataframe / csv
-# takes 1.30 min
+# takes 1.30 min with one worker, the models are validated in parallel (config: validation)
 import cobra 
 import os # generate storage path
 import sys
 import pandas as pd
-import yaml
 
 # include helper functions
 sys.path.append('../scripts/')
 import helperFunction as hf
 
-config_name = 'model_config'
-config_path = f'../config/{config_name}.yaml'
-
 # load config
-with open(config_path, 'r') as file:
-    config = yaml.safe_load(file)
+config = hf.load_config()
 
 # configs 
 _seperator = config['seperator']
 # ";" occures in error messages
 _seperator = _seperator if _seperator != ';' else '\t'
 
-def validate_models():
-    ## load models
-    models = hf.get_all_models() # get all models because I want to check e.coli and s.cerevisiae
-
-
+def error_table(validation):
+    """Returns the error dataframe (one row per model, one column per error category) of the validation results"""
     # create and store error dataframe:
     error_dict = { 'Model_Name': [],
     'SBML_FATAL': [],
@@ -38,19 +30,29 @@ def validate_models():
     'COBRA_WARNING': [],
     'COBRA_CHECK': []}
 
-    # iterate the models and store the errors in the error_dict
-    for model_name, model_path in models.items():
-        # load and validate model
-        model, report = cobra.io.validate_sbml_model(model_path)
+    for model_name, result in validation.items():
         error_dict['Model_Name'].append(model_name)
-        for key, value in report.items():
+        for key, value in result['report'].items():
             error_dict[key].append(value)
-    error_df = pd.DataFrame.from_dict(error_dict)
+    return pd.DataFrame.from_dict(error_dict)
 
+def validate_models():
+    ## load models
+    models = hf.get_all_models() # get all models because I want to check e.coli and s.cerevisiae
+
+    # validate each model once (in parallel, timeouts and crashes are stored as COBRA_FATAL error)
+    # the parsed models are stored in the model cache and the reports in the validation file,
+    # generate_model_numbers_table.py uses both instead of validating again
+    workers = config['validation']['workers']
+    if config['general']['snakemake']:
+        workers = snakemake.threads
+    validation = hf.validate_models_parallel(models, workers, config['validation']['timeout'], config, config['general']['verbose'])
+    hf.store_model_validation(validation, config['results']['model_validation'])
+
+    error_df = error_table(validation)
     os.makedirs('/'.join(config['results']['model_errors'].split('/')[0:-1]), exist_ok=True)  
     # save error_df
     error_df.to_csv(config['results']['model_errors'], sep=config['seperator'], index=False)
 
 if __name__ == '__main__':
     validate_models()
-
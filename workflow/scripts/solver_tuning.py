@@ -0,0 +1,44 @@
+# auto-tuning of the solver settings (config: solver/tuning): times FBA, pFBA and FVA of every model of experiments/growth_benchmark
+# (uptake limits of the first dataset condition) with every installed candidate and records the fastest stable choice per model (results/solver_tuning, used with solver/use_tuned)
+# imports
+import os
+import sys # append path
+
+import pandas as pd
+
+sys.path.append('../scripts/')
+import helperFunction as hf
+
+config = hf.load_config()
+
+# values:
+_verbose = config['general']['verbose']
+_snakemake = config['general']['snakemake']
+_tuning = config['solver']['tuning']
+_benchmark = config['experiments']['growth_benchmark'] # models (descriptors) and datasets (first condition)
+
+
+def main():
+    tuning = {}
+    report = []
+    for model_name, descriptor in _benchmark['models'].items():
+        dataset = _benchmark['datasets'][descriptor['dataset']]
+        tuning[model_name] = hf.tune_solver(model_name, descriptor, _tuning['candidates'], dataset, _tuning['fva_reactions'], _tuning['repeats'],
+                                            _tuning['tolerance'], _tuning['timeout'], config, _verbose)
+        print(f"{model_name}: {tuning[model_name]['settings']}")
+        for record in tuning[model_name]['candidates']:
+            report.append(dict({'model': model_name}, **record['settings'], **{key: record.get(key) for key in ('fba_s', 'pfba_s', 'fva_s', 'total_s', 'stable', 'error')}))
+    hf.store_solver_tuning(tuning, config['results']['solver_tuning'])
+
+    report = pd.DataFrame(report)
+    outfile = '../results/solver/solver_tuning_report.csv'
+    if _snakemake:
+        outfile = snakemake.output[1]
+    os.makedirs(os.path.dirname(outfile), exist_ok=True)
+    report.to_csv(outfile, sep=config['seperator'], index=False)
+    if _verbose:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
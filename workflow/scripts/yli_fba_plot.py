@@ -1,7 +1,6 @@
 # imports
 import cobra
 import yaml
-from cobra.flux_analysis import pfba
 # plotting
 import seaborn as sns
 import matplotlib.pyplot as plt
@@ -59,11 +58,33 @@ yli_experimental_growth = [0.26, 0.048, 0.08, 0.03, 0.07, 0.1, 0.2]
 
 
 
+# pFBA of all uptake conditions of a model on one problem (see helperFunction.BatchPFBA)
+def uptake_patches(glucose_exchange_reaction, fructose_exchange_reaction, maintenance_reaction):
+    """Returns the bound patch of every uptake condition: glucose (or fructose) uptake and optional maintenance"""
+    patches = []
+    for condition in yli_glucose_uptake:
+        if _use_fructose and fructose_exchange_reaction is not None:
+            patch = {glucose_exchange_reaction: (0, 1000), fructose_exchange_reaction: (-condition, 1000)}
+        else:
+            patch = {glucose_exchange_reaction: (-condition, 1000)}
+        if _add_maintenance:
+            patch[maintenance_reaction] = _NGAM
+        patches.append(patch)
+    return patches
+
+def simulate_growth(model, patches, biomass_reaction):
+    """Returns the pFBA growth rate of every uptake condition (0 if infeasible)"""
+    fluxes = hf.BatchPFBA(model, biomass_reaction).solve(patches, [biomass_reaction])
+    growth_rates = fluxes[biomass_reaction].fillna(0).tolist()
+    for condition, growthRate in zip(yli_glucose_uptake, growth_rates):
+        print(f'Growth rate on {condition} mmol/h {_condition_name}: {growthRate}')
+    return growth_rates
+
+
 # load models 
 # iYli21:
 print('iYli21_model')
-iYli21_model_path = config['models']['yli21']
-iYli21_model = cobra.io.read_sbml_model(iYli21_model_path)
+iYli21_model = hf.load_model('yli21', config)
 # set objective
 iYli21_model.objective = 'biomass_C'
 
@@ -74,32 +95,12 @@ maintenance_reaction = 'xMAINTENANCE'
 
 
 # Set glucose reaction to -2.43 mmol/h, 0.64 and 0.61 (based on Guo et al. 2022)
-iYli21_simulation_growth = []
-for condition in yli_glucose_uptake:
-    with iYli21_model as model:
-        if _use_fructose:
-            dGlu = model.reactions.get_by_id(glucose_exchange_reaction)
-            dGlu.bounds = (0, 1000)
-            dGlu = model.reactions.get_by_id(fructose_exchange_reaction)
-            dGlu.bounds = (-condition, 1000)
-        else:
-            dGlu = model.reactions.get_by_id(glucose_exchange_reaction)
-            dGlu.bounds = (-condition, 1000)
-        if _add_maintenance:
-            maintenacne_reaction = model.reactions.get_by_id(maintenance_reaction)
-            maintenacne_reaction.bounds = _NGAM
-        try:
-            pfba_solution = pfba(model)
-            growthRate = pfba_solution.fluxes[biomass_reaction]
-        except:
-            growthRate = 0
-        iYli21_simulation_growth.append(growthRate)
-        print(f'Growth rate on {condition} mmol/h {_condition_name}: {growthRate}')
+iYli21_simulation_growth = simulate_growth(iYli21_model, uptake_patches(glucose_exchange_reaction, fructose_exchange_reaction, maintenance_reaction), biomass_reaction)
 
 
 # iYali4:
 print('iYali4_model')
-iYali4_model = cobra.io.read_sbml_model(config['models']['yli4_corr'])
+iYali4_model = hf.load_model('yli4_corr', config)
 
 # set objective
 iYali4_model.objective = 'biomass_C'
@@ -113,33 +114,12 @@ biomass_reaction = 'biomass_C'
 maintenance_reaction = 'xMAINTENANCE'
 
 # Set glucose reaction to -2.43 mmol/h, 0.64 and 0.61 (based on Guo et al. 2022)
-iYali4_simulation_growth = []
-for condition in yli_glucose_uptake:
-    with iYali4_model as model:
-        if _use_fructose:
-            dGlu = model.reactions.get_by_id(glucose_exchange_reaction)
-            dGlu.bounds = (0, 1000)
-            dGlu = model.reactions.get_by_id(fructose_exchange_reaction)
-            dGlu.bounds = (-condition, 1000)
-        else:
-            dGlu = model.reactions.get_by_id(glucose_exchange_reaction)
-            dGlu.bounds = (-condition, 1000)
-        if _add_maintenance:
-            maintenacne_reaction = model.reactions.get_by_id(maintenance_reaction)
-            maintenacne_reaction.bounds = _NGAM
-        try:
-            pfba_solution = pfba(model)
-            growthRate = pfba_solution.fluxes[biomass_reaction]
-        except:
-            growthRate = 0
-        iYali4_simulation_growth.append(growthRate)
-        print(f'Growth rate on {condition} mmol/h {_condition_name}: {growthRate}')
+iYali4_simulation_growth = simulate_growth(iYali4_model, uptake_patches(glucose_exchange_reaction, fructose_exchange_reaction, maintenance_reaction), biomass_reaction)
 
 
 # iMK735:
 print('iMK735_model')
-iMK735_model_path = config['models']['yliMK735_corr']
-iMK735_model = cobra.io.read_sbml_model(iMK735_model_path)
+iMK735_model = hf.load_model('yliMK735_corr', config)
 
 
 # set objective
@@ -152,33 +132,12 @@ biomass_reaction = 'biomass_C'
 # maintenance
 maintenance_reaction = 'ATPM'
 
-iMK735_simulation_growth = []
-for condition in yli_glucose_uptake:
-    with iMK735_model as model:
-        if _use_fructose:
-            dGlu = model.reactions.get_by_id(glucose_exchange_reaction)
-            dGlu.bounds = (0, 1000)
-            dGlu = model.reactions.get_by_id(fructose_exchange_reaction)
-            dGlu.bounds = (-condition, 1000)
-        else:
-            dGlu = model.reactions.get_by_id(glucose_exchange_reaction)
-            dGlu.bounds = (-condition, 1000)
-        if _add_maintenance:
-            maintenacne_reaction = model.reactions.get_by_id(maintenance_reaction)
-            maintenacne_reaction.bounds = _NGAM
-        try:
-            pfba_solution = pfba(model)
-            growthRate = pfba_solution.fluxes[biomass_reaction]
-        except:
-            growthRate = 0
-        iMK735_simulation_growth.append(growthRate)
-        print(f'Growth rate on {condition} mmol/h {_condition_name}: {growthRate}')
+iMK735_simulation_growth = simulate_growth(iMK735_model, uptake_patches(glucose_exchange_reaction, fructose_exchange_reaction, maintenance_reaction), biomass_reaction)
 
 
 # iNL895:
 print('iNL895_model')
-iNL895_model_path = config['models']['yliNL895_corr']
-iNL895_model = cobra.io.read_sbml_model(iNL895_model_path)
+iNL895_model = hf.load_model('yliNL895_corr', config)
 
 # set objective
 iNL895_model.objective = 'biomass_C'
@@ -189,23 +148,12 @@ iNL895_model.objective = 'biomass_C'
 # Set glucose reaction to -2.43 mmol/h, 0.64 and 0.61 (based on Guo et al. 2022)
 biomass_reaction = 'biomass_C' # 'biomass_C' # 'r_1814' # 'r_021_xxx'
 glucose_exchange_reaction = 'r_51_exchange'
-iNL895_simulation_growth = []
-for condition in yli_glucose_uptake:
-    with iNL895_model:
-        dGlu = iNL895_model.reactions.get_by_id(glucose_exchange_reaction)
-        dGlu.bounds = (-1000, condition)
-        try:
-            pfba_solution = pfba(iNL895_model)
-            growthRate = pfba_solution.fluxes[biomass_reaction]
-        except:
-            growthRate = 0
-        iNL895_simulation_growth.append(growthRate)
-        print(f'Growth rate on {condition} mmol/h {_condition_name}: {growthRate}')
+# glucose exchange is defined as "glucose -->"
+iNL895_simulation_growth = simulate_growth(iNL895_model, [{glucose_exchange_reaction: (-1000, condition)} for condition in yli_glucose_uptake], biomass_reaction)
 
 # iYli_2.0: 
 print('iyli_2.0_model')
-iyli2_0_model_path = config['models']['yli2.0_corr']
-iyli2_0_model = cobra.io.read_sbml_model(iyli2_0_model_path)
+iyli2_0_model = hf.load_model('yli2.0_corr', config)
 
 
 # set objective
@@ -220,32 +168,11 @@ biomass_reaction = 'biomass_C'
 maintenance_reaction = 'R0542'
 
 # Set glucose reaction to -2.43 mmol/h, 0.64 and 0.61 (based on Guo et al. 2022)
-iyli2_0_simulation_growth = []
-for condition in yli_glucose_uptake:
-    with iyli2_0_model as model:
-        if _use_fructose:
-            dGlu = model.reactions.get_by_id(glucose_exchange_reaction)
-            dGlu.bounds = (0, 1000)
-            dGlu = model.reactions.get_by_id(fructose_exchange_reaction)
-            dGlu.bounds = (-condition, 1000)
-        else:
-            dGlu = model.reactions.get_by_id(glucose_exchange_reaction)
-            dGlu.bounds = (-condition, 1000)
-        if _add_maintenance:
-            maintenacne_reaction = model.reactions.get_by_id(maintenance_reaction)
-            maintenacne_reaction.bounds = _NGAM
-        try:
-            pfba_solution = pfba(model)
-            growthRate = pfba_solution.fluxes[biomass_reaction]
-        except:
-            growthRate = 0
-        iyli2_0_simulation_growth.append(growthRate)
-        print(f'Growth rate on {condition} mmol/h {_condition_name}: {growthRate}')
+iyli2_0_simulation_growth = simulate_growth(iyli2_0_model, uptake_patches(glucose_exchange_reaction, fructose_exchange_reaction, maintenance_reaction), biomass_reaction)
 
 # iYLI647:
 print('iYLI647_model')
-iyli647_model_path = config['models']['yli647_corr']
-iyli647_model = cobra.io.read_sbml_model(iyli647_model_path)
+iyli647_model = hf.load_model('yli647_corr', config)
 
 # set objective
 iyli647_model.objective = 'biomass_C'
@@ -258,21 +185,7 @@ biomass_reaction = 'biomass_C'
 maintenance_reaction = 'ATPM'
 
 # Set glucose reaction to -2.43 mmol/h, 0.64 and 0.61 (based on Guo et al. 2022)
-iyli647_simulation_growth = []
-for condition in yli_glucose_uptake:
-    with iyli647_model as model:
-        dGlu = model.reactions.get_by_id(glucose_exchange_reaction)
-        dGlu.bounds = (-condition, 1000)
-        if _add_maintenance:
-            maintenacne_reaction = model.reactions.get_by_id(maintenance_reaction)
-            maintenacne_reaction.bounds = _NGAM
-        try:
-            pfba_solution = pfba(model)
-            growthRate = pfba_solution.fluxes[biomass_reaction]
-        except:
-            growthRate = 0
-        iyli647_simulation_growth.append(growthRate)
-        print(f'Growth rate on {condition} mmol/h {_condition_name}: {growthRate}')
+iyli647_simulation_growth = simulate_growth(iyli647_model, uptake_patches(glucose_exchange_reaction, None, maintenance_reaction), biomass_reaction)
 
 # dataframe of experimental and simulated growth rates
 # generate dataframe with experimental results